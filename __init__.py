@@ -6,11 +6,16 @@ import logging
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant, ServiceCall
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
-from .coordinator import EVSEMasterDataUpdateCoordinator
-from .const import DOMAIN,SERVICE_ACTION_START_CHARGING, SERVICE_DATA_DURATION_HOURS, SERVICE_DATA_MAX_AMPS, SERVICE_DATA_START_DATETIME
+from .coordinator import EVSEMasterDataUpdateCoordinator, async_get_coordinator_for_device
+from .const import DOMAIN,SERVICE_ACTION_START_CHARGING, SERVICE_ACTION_SESSION_ANALYTICS, SERVICE_DATA_DURATION_HOURS, SERVICE_DATA_MAX_AMPS, SERVICE_DATA_START_DATETIME
+from .analytics import SESSION_ANALYTICS_SCHEMA, async_session_analytics_service
+from .scheduler import async_get_scheduler
+from .websocket_api import async_register_websocket_commands
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,13 +25,72 @@ PLATFORMS: list[Platform] = [
     Platform.BINARY_SENSOR,
     Platform.TEXT,
     Platform.NUMBER,
+    Platform.DATETIME,
 ]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the parts of EVSEMaster shared by all chargers."""
+    async_register_websocket_commands(hass)
+
+    # init start/stop service actions, routed to the targeted chargers
+    async def start_charge_service_call(service: ServiceCall) -> None:
+        max_amps = service.data.get(SERVICE_DATA_MAX_AMPS)
+        duration_hours = service.data.get(SERVICE_DATA_DURATION_HOURS)
+        start_datetime = service.data.get(SERVICE_DATA_START_DATETIME)
+        for coordinator in _coordinators_for_call(hass, service):
+            success = await coordinator.async_start_charging(max_amps, start_datetime, duration_hours)
+            if not success:
+                raise HomeAssistantError(
+                    f"Failed to start charging on {coordinator.data.device.serial_number}"
+                )
+
+    hass.services.async_register(DOMAIN, SERVICE_ACTION_START_CHARGING, start_charge_service_call)
+
+    async def session_analytics_service_call(service: ServiceCall):
+        return await async_session_analytics_service(hass, service)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_ACTION_SESSION_ANALYTICS,
+        session_analytics_service_call,
+        schema=SESSION_ANALYTICS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    return True
+
+
+def _coordinators_for_call(
+    hass: HomeAssistant, service: ServiceCall
+) -> list[EVSEMasterDataUpdateCoordinator]:
+    """Coordinators of the devices a service call targets."""
+    device_ids = service.data.get("device_id")
+    if not device_ids:
+        # untargeted calls from before multi-charger support: fine with one charger
+        entries = hass.config_entries.async_loaded_entries(DOMAIN)
+        if len(entries) != 1:
+            raise ServiceValidationError("Select the charger to use")
+        return [entries[0].runtime_data]
+    if isinstance(device_ids, str):
+        device_ids = [device_ids]
+    coordinators = []
+    for device_id in device_ids:
+        coordinator = async_get_coordinator_for_device(hass, device_id)
+        if coordinator is None:
+            raise ServiceValidationError(f"Device {device_id} is not a loaded EVSEMaster charger")
+        coordinators.append(coordinator)
+    return coordinators
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up EVSEMaster from a config entry."""
 
     coordinator = EVSEMasterDataUpdateCoordinator(hass, entry)
+    await coordinator.command_queue.async_load()
+    await coordinator.session.async_load()
+    await coordinator.cost.async_load()
 
     try:
         await coordinator.async_config_entry_first_refresh()
@@ -35,31 +99,30 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         raise ConfigEntryNotReady from err
 
     entry.runtime_data = coordinator
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    # init start/stop service actions
-    async def start_charge_service_call(service: ServiceCall) -> bool:
-        device_id = service.data.get("device_id")
-        #TODO: figure out how to get current device_id to validate againt incoming device_id
-        max_amps = service.data.get(SERVICE_DATA_MAX_AMPS)
-        duration_hours = service.data.get(SERVICE_DATA_DURATION_HOURS)
-        start_datetime = service.data.get(SERVICE_DATA_START_DATETIME)
-        success = await coordinator.async_start_charging(max_amps, start_datetime, duration_hours)
-        if not success:
-            raise Exception("Failed to start charging")
-        return success
-    
-    hass.services.async_register(DOMAIN, SERVICE_ACTION_START_CHARGING, start_charge_service_call)
 
+    if coordinator.fleet_max_active > 0:
+        async_get_scheduler(hass).async_register(coordinator)
     return True
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         coordinator = entry.runtime_data
+        if coordinator.scheduler is not None:
+            coordinator.scheduler.async_unregister(coordinator)
         await coordinator.async_shutdown()
+        await coordinator.session.async_unload()
+        await coordinator.cost.async_unload()
 
 
     return unload_ok
@@ -0,0 +1,319 @@
+"""Session analytics over recorded EVSEMaster samples."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import logging
+from typing import Any
+
+import numpy as np
+import voluptuous as vol
+
+from homeassistant.components.recorder import get_instance, history
+from homeassistant.components.recorder.statistics import statistics_during_period
+from homeassistant.const import (
+    COMPRESSED_STATE_LAST_UPDATED,
+    COMPRESSED_STATE_STATE,
+    STATE_UNAVAILABLE,
+    STATE_UNKNOWN,
+)
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    SERVICE_DATA_DERATING_TEMPERATURE,
+    SERVICE_DATA_END_TIME,
+    SERVICE_DATA_POWER_THRESHOLD,
+    SERVICE_DATA_START_TIME,
+    SERVICE_DATA_VOLTAGE,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# unique_id suffix of the entity holding each sample series
+SERIES_POWER = "current_power"
+SERIES_TEMPERATURE = "inner_temperature"
+SERIES_ENERGY = "total_kwh"
+SERIES_AMPS = "configured_max_amps"
+SERIES_KEYS = (SERIES_POWER, SERIES_TEMPERATURE, SERIES_ENERGY, SERIES_AMPS)
+
+# power below this fraction of amps * voltage while hot counts as derated
+DERATING_RATIO = 0.9
+
+# long-term statistics column and timestamp used for each series
+STATISTICS_COLUMNS = {
+    SERIES_POWER: ("mean", "start"),
+    SERIES_TEMPERATURE: ("mean", "start"),
+    SERIES_ENERGY: ("state", "end"),
+}
+
+_INVALID_STATES = ("", STATE_UNKNOWN, STATE_UNAVAILABLE)
+_EMPTY = np.empty(0, dtype=np.float64)
+
+SESSION_ANALYTICS_SCHEMA = vol.Schema(
+    {
+        vol.Required("device_id"): vol.All(cv.ensure_list, [cv.string]),
+        vol.Required(SERVICE_DATA_START_TIME): cv.datetime,
+        vol.Optional(SERVICE_DATA_END_TIME): cv.datetime,
+        vol.Optional(SERVICE_DATA_POWER_THRESHOLD, default=0): vol.Coerce(float),
+        vol.Optional(SERVICE_DATA_DERATING_TEMPERATURE, default=60): vol.Coerce(float),
+        vol.Optional(SERVICE_DATA_VOLTAGE, default=230): vol.Coerce(float),
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+
+def _to_series(states: list[dict[str, Any]]) -> tuple[np.ndarray, np.ndarray]:
+    """Convert compressed recorder states into (timestamps, values) arrays."""
+    if not states:
+        return _EMPTY, _EMPTY
+    count = len(states)
+    times = np.fromiter(
+        (s[COMPRESSED_STATE_LAST_UPDATED] for s in states), dtype=np.float64, count=count
+    )
+    raw = np.array([s[COMPRESSED_STATE_STATE] for s in states], dtype=np.str_)
+    values = np.full(count, np.nan)
+    valid = ~np.isin(raw, _INVALID_STATES)
+    try:
+        values[valid] = raw[valid].astype(np.float64)
+    except ValueError:
+        # a non-numeric state slipped in; fall back to parsing per sample
+        for i in np.flatnonzero(valid):
+            try:
+                values[i] = float(raw[i])
+            except ValueError:
+                pass
+    return times, values
+
+
+def _statistics_series(
+    rows: list[dict[str, Any]], column: str, time_column: str
+) -> tuple[np.ndarray, np.ndarray]:
+    """Convert hourly statistics rows into (timestamps, values) arrays."""
+    if not rows:
+        return _EMPTY, _EMPTY
+    count = len(rows)
+    times = np.fromiter((r[time_column] for r in rows), dtype=np.float64, count=count)
+    values = np.fromiter(
+        (np.nan if r.get(column) is None else r[column] for r in rows),
+        dtype=np.float64,
+        count=count,
+    )
+    return times, values
+
+
+def _join(
+    older: tuple[np.ndarray, np.ndarray], recent: tuple[np.ndarray, np.ndarray]
+) -> tuple[np.ndarray, np.ndarray]:
+    if older[0].size == 0:
+        return recent
+    return np.concatenate((older[0], recent[0])), np.concatenate((older[1], recent[1]))
+
+
+def _hold(times: np.ndarray, values: np.ndarray, at: np.ndarray) -> np.ndarray:
+    """Sample a step series (last value holds until the next change) at given times."""
+    if times.size == 0:
+        return np.full(at.shape, np.nan)
+    idx = np.searchsorted(times, at, side="right") - 1
+    return np.where(idx >= 0, values[np.clip(idx, 0, None)], np.nan)
+
+
+def _meter_delta(values: np.ndarray) -> float:
+    """Energy counted by a kWh meter, tolerating counter resets."""
+    values = values[np.isfinite(values)]
+    if values.size < 2:
+        return 0.0
+    steps = np.diff(values)
+    # a drop means the counter restarted from zero
+    return float(np.where(steps < 0, values[1:], steps).sum())
+
+
+def compute_session_analytics(
+    series: dict[str, tuple[np.ndarray, np.ndarray]],
+    start_ts: float,
+    end_ts: float,
+    power_threshold: float,
+    derating_temperature: float,
+    voltage: float,
+) -> dict[str, Any]:
+    """Compute analytics for one charger over [start_ts, end_ts)."""
+    t_power, v_power = series.get(SERIES_POWER, (_EMPTY, _EMPTY))
+    t_temp, v_temp = series.get(SERIES_TEMPERATURE, (_EMPTY, _EMPTY))
+    t_amps, v_amps = series.get(SERIES_AMPS, (_EMPTY, _EMPTY))
+    _, v_energy = series.get(SERIES_ENERGY, (_EMPTY, _EMPTY))
+
+    # every change of any series starts a new constant segment
+    edges = np.unique(np.concatenate((t_power, t_temp, t_amps)))
+    edges = edges[(edges > start_ts) & (edges < end_ts)]
+    edges = np.concatenate(([start_ts], edges))
+    dt = np.diff(np.append(edges, end_ts))
+
+    power = _hold(t_power, v_power, edges)
+    temp = _hold(t_temp, v_temp, edges)
+    expected = _hold(t_amps, v_amps, edges) * voltage
+
+    known = np.isfinite(power)
+    power = np.where(known, power, 0.0)
+    charging = power > 0
+    hot = np.isfinite(temp) & (temp >= derating_temperature)
+    rated = charging & np.isfinite(expected) & (expected > 0)
+    derated = rated & hot & (power < DERATING_RATIO * expected)
+
+    # amps are a number entity without long-term statistics, so efficiency and
+    # derating only cover the part of the period where amps history exists
+    amps_known = edges[np.isfinite(expected)]
+    rated_from = (
+        dt_util.utc_from_timestamp(float(amps_known[0])).isoformat() if amps_known.size else None
+    )
+
+    energy_j = float(np.sum(power * dt))
+    rated_energy_j = float(np.sum(power[rated] * dt[rated]))
+    expected_energy_j = float(np.sum(expected[rated] * dt[rated]))
+    shortfall_j = float(np.sum((expected[derated] - power[derated]) * dt[derated]))
+
+    temp_known = np.isfinite(temp)
+    temp_time = float(dt[temp_known].sum())
+    correlation = None
+    pairs = charging & temp_known
+    if np.count_nonzero(pairs) > 1 and np.ptp(temp[pairs]) > 0 and np.ptp(power[pairs]) > 0:
+        correlation = round(float(np.corrcoef(temp[pairs], power[pairs])[0, 1]), 3)
+
+    return {
+        "samples": int(t_power.size),
+        "covered_seconds": round(float(dt[known].sum()), 1),
+        "energy_kwh": round(energy_j / 3.6e6, 3),
+        "meter_energy_kwh": round(_meter_delta(v_energy), 3),
+        "charging_seconds": round(float(dt[charging].sum()), 1),
+        "peak_power": round(float(power.max()), 1) if power.size else 0.0,
+        "seconds_above_threshold": round(float(dt[power > power_threshold].sum()), 1),
+        "efficiency": (
+            round(rated_energy_j / expected_energy_j, 3) if expected_energy_j > 0 else None
+        ),
+        "efficiency_from": rated_from,
+        "max_inner_temperature": (
+            round(float(np.nanmax(temp)), 1) if temp_known.any() else None
+        ),
+        "mean_inner_temperature": (
+            round(float(np.sum(temp[temp_known] * dt[temp_known]) / temp_time), 1)
+            if temp_time > 0
+            else None
+        ),
+        "derating_from": rated_from,
+        "derated_seconds": round(float(dt[derated].sum()), 1),
+        "derating_shortfall_kwh": round(shortfall_j / 3.6e6, 3),
+        "temperature_power_correlation": correlation,
+    }
+
+
+def _resolve_entities(hass: HomeAssistant, device_ids: list[str]) -> dict[str, dict[str, str]]:
+    """Map each device to the entity ids of its sample series."""
+    registry = er.async_get(hass)
+    resolved: dict[str, dict[str, str]] = {}
+    for device_id in device_ids:
+        entities: dict[str, str] = {}
+        for entity in er.async_entries_for_device(registry, device_id):
+            if entity.platform != DOMAIN or not entity.unique_id:
+                continue
+            for key in SERIES_KEYS:
+                if entity.unique_id.endswith(f"_{key}"):
+                    entities[key] = entity.entity_id
+        if SERIES_POWER not in entities:
+            raise ServiceValidationError(
+                f"Device {device_id} has no EVSEMaster power sensor"
+            )
+        resolved[device_id] = entities
+    return resolved
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt_util.get_default_time_zone())
+    return dt_util.as_utc(value)
+
+
+def _floor_hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+async def async_session_analytics_service(hass: HomeAssistant, service: ServiceCall) -> ServiceResponse:
+    """Load recorded samples for the target chargers in bulk and analyse them."""
+    start = _as_utc(service.data[SERVICE_DATA_START_TIME])
+    end = _as_utc(service.data.get(SERVICE_DATA_END_TIME) or dt_util.utcnow())
+    if end <= start:
+        raise ServiceValidationError("end_time must be after start_time")
+
+    resolved = _resolve_entities(hass, service.data["device_id"])
+    entity_ids = [eid for entities in resolved.values() for eid in entities.values()]
+    power_threshold = service.data[SERVICE_DATA_POWER_THRESHOLD]
+    derating_temperature = service.data[SERVICE_DATA_DERATING_TEMPERATURE]
+    voltage = service.data[SERVICE_DATA_VOLTAGE]
+
+    # states are purged after keep_days; older periods come from hourly statistics
+    keep_days = get_instance(hass).keep_days
+    recent_start = max(start, _floor_hour(dt_util.utcnow() - timedelta(days=keep_days)) + timedelta(hours=1))
+    statistics_end = min(recent_start, end)
+
+    def _load_and_compute() -> dict[str, Any]:
+        statistics: dict[str, list[dict[str, Any]]] = {}
+        if statistics_end > start:
+            # one row before the period gives the meter reading at its start
+            statistics = statistics_during_period(
+                hass,
+                _floor_hour(start) - timedelta(hours=1),
+                statistics_end,
+                set(entity_ids),
+                "hour",
+                None,
+                {"mean", "max", "state"},
+            )
+        states: dict[str, list[dict[str, Any]]] = {}
+        if recent_start < end:
+            # one query for every series of every charger
+            states = history.get_significant_states(
+                hass,
+                recent_start,
+                end,
+                entity_ids,
+                include_start_time_state=True,
+                significant_changes_only=False,
+                minimal_response=True,
+                no_attributes=True,
+                compressed_state_format=True,
+            )
+        results: dict[str, Any] = {}
+        for device_id, entities in resolved.items():
+            series = {}
+            for key, entity_id in entities.items():
+                recent = _to_series(states.get(entity_id, []))
+                if key in STATISTICS_COLUMNS and entity_id in statistics:
+                    older = _statistics_series(statistics[entity_id], *STATISTICS_COLUMNS[key])
+                    recent = _join(older, recent)
+                series[key] = recent
+            result = compute_session_analytics(
+                series,
+                start.timestamp(),
+                end.timestamp(),
+                power_threshold,
+                derating_temperature,
+                voltage,
+            )
+            # hourly means hide the peaks; the statistics keep the hourly maximum
+            peak_times, peaks = _statistics_series(statistics.get(entities[SERIES_POWER], []), "max", "start")
+            peaks = peaks[peak_times >= _floor_hour(start).timestamp()]
+            if np.isfinite(peaks).any():
+                result["peak_power"] = max(result["peak_power"], round(float(np.nanmax(peaks)), 1))
+            results[device_id] = result
+        return results
+
+    _LOGGER.debug("Running session analytics for %d entities", len(entity_ids))
+    chargers = await get_instance(hass).async_add_executor_job(_load_and_compute)
+    return {
+        "start_time": start.isoformat(),
+        "end_time": end.isoformat(),
+        # before this, hourly long-term statistics stand in for the purged states
+        "full_resolution_from": min(recent_start, end).isoformat(),
+        "chargers": chargers,
+    }
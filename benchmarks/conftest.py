@@ -0,0 +1,249 @@
+"""Fixtures and baseline bookkeeping for the EVSEMaster hot-path benchmarks.
+
+Run with `pytest benchmarks`, not `python -m pytest`: that puts the repository
+root on sys.path, where the datetime platform shadows the standard library.
+Results are written to bench_output.txt; set EVSEMASTER_BENCH_UPDATE=1 to store
+them as the new baselines.
+"""
+
+from __future__ import annotations
+
+import gc
+import importlib.util
+import json
+import os
+from pathlib import Path
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+import types
+from collections.abc import Awaitable, Callable, Generator
+from typing import Any
+
+import pytest
+
+from homeassistant.const import __version__ as HA_VERSION
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from synthetic import device_info
+
+ROOT = Path(__file__).resolve().parents[1]
+BASELINES = Path(__file__).with_name("baselines.json")
+OUTPUT = ROOT / "bench_output.txt"
+UPDATE_BASELINES = os.environ.get("EVSEMASTER_BENCH_UPDATE") == "1"
+
+# allowed drift before a result counts as a regression
+THROUGHPUT_TOLERANCE = 0.30
+MEMORY_TOLERANCE = 0.25
+# per-event floors for baselines near zero: 1 byte is 20 KiB over a 20k event pass,
+# and 0.02 blocks a leak of one block every 50 events
+PEAK_BYTES_SLACK = 1.0
+NET_BLOCKS_SLACK = 0.02
+# short passes are noisy; the median of a few is the stable figure
+TIMING_ROUNDS = 5
+MEASURE_ATTEMPTS = 3
+REFERENCE_LOOPS = 20_000
+PLATFORMS = ("sensor", "binary_sensor", "button", "number", "text", "datetime")
+
+_results: dict[str, dict[str, float]] = {}
+
+
+def _load_integration() -> types.ModuleType:
+    """Import the repository root as custom_components.evsemaster."""
+    name = "custom_components.evsemaster"
+    if name in sys.modules:
+        return sys.modules[name]
+    if "custom_components" not in sys.modules:
+        namespace = types.ModuleType("custom_components")
+        namespace.__path__ = []
+        sys.modules["custom_components"] = namespace
+    spec = importlib.util.spec_from_file_location(
+        name, ROOT / "__init__.py", submodule_search_locations=[str(ROOT)]
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    for platform_name in PLATFORMS:
+        importlib.import_module(f"{name}.{platform_name}")
+    return module
+
+
+@pytest.fixture(scope="session")
+def integration() -> types.ModuleType:
+    return _load_integration()
+
+
+@pytest.fixture(scope="session")
+def data_types(integration: types.ModuleType) -> Any:
+    return sys.modules["custom_components.evsemaster.evse_loader"].data_types
+
+
+class FakeProtocol:
+    """Stand-in for SimpleEVSEProtocol: no sockets, fixed device info."""
+
+    is_logged_in = True
+
+    def __init__(self, device: Any) -> None:
+        self.device = device
+
+    def get_latest_device_info(self) -> Any:
+        return self.device
+
+    async def disconnect(self) -> None:
+        return None
+
+
+@pytest.fixture
+def make_fleet(
+    hass: HomeAssistant, integration: types.ModuleType, data_types: Any
+) -> Generator[Callable[[int], list[Any]]]:
+    """Build coordinators for `count` simulated chargers."""
+    coordinator_module = sys.modules["custom_components.evsemaster.coordinator"]
+    fleet: list[Any] = []
+
+    def _make(count: int) -> list[Any]:
+        for index in range(count):
+            entry = MockConfigEntry(
+                domain=integration.DOMAIN,
+                data={"host": f"10.0.{index // 250}.{index % 250 + 1}", "password": "123456"},
+            )
+            entry.add_to_hass(hass)
+            coordinator = coordinator_module.EVSEMasterDataUpdateCoordinator(hass, entry)
+            device = device_info(data_types, index)
+            coordinator.proto = FakeProtocol(device)
+            coordinator._connected = True
+            coordinator._ensure_serial()
+            fleet.append(coordinator)
+        return fleet
+
+    yield _make
+
+    # async_set_updated_data reschedules the poll timer; don't leave it lingering
+    for coordinator in fleet:
+        coordinator._unschedule_refresh()
+
+
+def _reference_pass() -> float:
+    """Time a fixed pure-Python workload of dict, attribute and small object churn."""
+    sample = types.SimpleNamespace(power=0.0, state=0)
+    table: dict[int, float] = {}
+    start = time.perf_counter()
+    for i in range(REFERENCE_LOOPS):
+        sample.power = i * 0.5
+        sample.state = i & 7
+        table[i & 255] = sample.power + table.get(sample.state, 0.0)
+        str(sample.state)
+    return time.perf_counter() - start
+
+
+async def measure(run: Callable[[], Awaitable[int]]) -> dict[str, float]:
+    """Time TIMING_ROUNDS passes of `run`, then repeat it under tracemalloc.
+
+    `run` returns the number of events it processed. Each pass is paired with a
+    reference pass, and `events_per_reference` (events processed in the time of
+    that reference pass, median over the rounds) is what gets compared, so a
+    throttled or slower host moves both sides and cancels out.
+    """
+    timings = []
+    relative = []
+    for _ in range(TIMING_ROUNDS):
+        gc.collect()
+        reference = _reference_pass()
+        start = time.perf_counter()
+        events = await run()
+        elapsed = time.perf_counter() - start
+        timings.append(elapsed)
+        relative.append(events * reference / elapsed)
+
+    gc.collect()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    blocks = sys.getallocatedblocks()
+    await run()
+    _, peak = tracemalloc.get_traced_memory()
+    gc.collect()
+    # net growth, not allocations: steady-state hot paths should stay near zero
+    net_blocks = sys.getallocatedblocks() - blocks
+    tracemalloc.stop()
+
+    return {
+        "events_per_sec": round(events / statistics.median(timings), 1),
+        "events_per_reference": round(statistics.median(relative), 3),
+        # what the pass holds at its high-water mark, spread over its events
+        "peak_bytes_per_event": round((peak - base) / events, 2),
+        "net_blocks_per_event": round(net_blocks / events, 4),
+        "peak_kib": round((peak - base) / 1024, 1),
+    }
+
+
+def _regressions(name: str, result: dict[str, float]) -> list[str]:
+    """Compare a result with its stored baseline, failing if there is none."""
+    baselines = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+    baseline = baselines.get(name)
+    if baseline is None:
+        pytest.fail(
+            f"No stored baseline for {name}; run with EVSEMASTER_BENCH_UPDATE=1 to record one"
+        )
+    problems = []
+    if result["events_per_reference"] < baseline["events_per_reference"] * (
+        1 - THROUGHPUT_TOLERANCE
+    ):
+        problems.append(
+            f"throughput {result['events_per_reference']} vs baseline "
+            f"{baseline['events_per_reference']} events/reference pass"
+        )
+    if result["net_blocks_per_event"] > (
+        baseline["net_blocks_per_event"] * (1 + MEMORY_TOLERANCE) + NET_BLOCKS_SLACK
+    ):
+        problems.append(
+            f"net blocks/event {result['net_blocks_per_event']} vs baseline {baseline['net_blocks_per_event']}"
+        )
+    if result["peak_bytes_per_event"] > (
+        baseline["peak_bytes_per_event"] * (1 + MEMORY_TOLERANCE) + PEAK_BYTES_SLACK
+    ):
+        problems.append(
+            f"peak {result['peak_bytes_per_event']} bytes/event vs baseline {baseline['peak_bytes_per_event']}"
+        )
+    return problems
+
+
+async def benchmark(name: str, run: Callable[[], Awaitable[int]]) -> None:
+    """Measure `run`, record the result and fail if it regressed past its baseline.
+
+    A regression is re-measured up to MEASURE_ATTEMPTS times before failing: a
+    real one persists, interference from other work on the host does not.
+    """
+    problems: list[str] = []
+    for _ in range(MEASURE_ATTEMPTS):
+        result = await measure(run)
+        if UPDATE_BASELINES:
+            break
+        problems = _regressions(name, result)
+        if not problems:
+            break
+    _results[name] = result
+    if problems:
+        pytest.fail(f"{name} regressed: " + "; ".join(problems))
+
+
+def pytest_sessionfinish(session: pytest.Session, exitstatus: int) -> None:
+    if not _results:
+        return
+    lines = [
+        f"{name:48} {r['events_per_sec']:>12.1f}/s {r['events_per_reference']:>10.3f} ev/ref {r['peak_bytes_per_event']:>10.2f} B/ev {r['net_blocks_per_event']:>8.4f} net blk/ev {r['peak_kib']:>10.1f} KiB"
+        for name, r in sorted(_results.items())
+    ]
+    OUTPUT.write_text("\n".join(lines) + "\n")
+    if UPDATE_BASELINES:
+        stored = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+        stored.update(_results)
+        stored["_environment"] = {
+            "python": platform.python_version(),
+            "homeassistant": HA_VERSION,
+            "machine": platform.machine(),
+            "processor_count": os.cpu_count(),
+        }
+        BASELINES.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
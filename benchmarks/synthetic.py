@@ -0,0 +1,80 @@
+"""Synthetic EVSEMaster push streams for benchmarks."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+import random
+from typing import Any
+
+
+def device_info(data_types: Any, index: int, revision: int = 0) -> Any:
+    """Device info of simulated charger `index`; bump revision to simulate a change."""
+    return data_types.EvseDeviceInfo(
+        serial_number=f"BENCH{index:06d}",
+        nickname=f"Charger {index} r{revision}",
+        brand="Bench",
+        model="SIM-32",
+        hardware_version="1.0",
+        max_amps=32,
+        configured_max_amps=16,
+    )
+
+
+def status_stream(data_types: Any, seed: int) -> Iterator[Any]:
+    """Endless EvseStatus stream: idle, plug in, charge with taper, unplug."""
+    rng = random.Random(seed)
+    states = data_types.CurrentStateEnum
+    plugs = data_types.PlugStateEnum
+    total_kwh = rng.uniform(0, 5000)
+    tick = 0
+    while True:
+        phase = tick % 600
+        if phase < 50:
+            state, plug, power = states.NOT_CONNECTED, plugs.DISCONNECTED, 0.0
+        elif phase < 550:
+            state, plug = states.CHARGING, plugs.CONNECTED_LOCKED
+            power = max(7400.0 - max(phase - 400, 0) * 40, 1400.0) + rng.uniform(-50, 50)
+        else:
+            state, plug, power = states.COMPLETED, plugs.CONNECTED_UNLOCKED, 0.0
+        total_kwh += power / 3.6e6
+        yield data_types.EvseStatus.model_construct(
+            current_state=state,
+            plug_state=plug,
+            current_power=round(power, 1),
+            total_kwh=round(total_kwh, 3),
+            inner_temperature=round(35 + power / 500 + rng.uniform(-1, 1), 1),
+            outer_temperature=round(15 + rng.uniform(-1, 1), 1),
+        )
+        tick += 1
+
+
+def charging_status_stream(data_types: Any, seed: int) -> Iterator[Any]:
+    """Endless ChargingStatus stream alternating between with and without a reservation."""
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    tick = 0
+    while True:
+        reserved = tick % 2 == 0
+        yield data_types.ChargingStatus.model_construct(
+            charge_id=f"{seed}-{tick // 60}",
+            user_id=f"user{tick // 60 % 3}",
+            reservation_datetime=start + timedelta(minutes=tick) if reserved else None,
+            max_duration_minutes=rng.choice((60, 120, 240)) if reserved else None,
+        )
+        tick += 1
+
+
+def event_stream(data_types: Any, index: int, seed: int) -> Iterator[tuple[str, Any]]:
+    """Mixed protocol events as SimpleEVSEProtocol delivers them: mostly status pushes."""
+    statuses = status_stream(data_types, seed)
+    charging = charging_status_stream(data_types, seed + 1)
+    tick = 0
+    while True:
+        if tick % 500 == 499:
+            yield data_types.EvseDeviceInfo.__name__, device_info(data_types, index, tick)
+        elif tick % 10 == 9:
+            yield data_types.ChargingStatus.__name__, next(charging)
+        else:
+            yield data_types.EvseStatus.__name__, next(statuses)
+        tick += 1
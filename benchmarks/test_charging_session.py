@@ -0,0 +1,157 @@
+"""Charging session and cost accounting across pushes, reloads and counter resets."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+import sys
+from typing import Any
+
+from freezegun.api import FrozenDateTimeFactory
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+ENTRY_ID = "charger"
+
+
+@pytest.fixture
+def session_module(integration: Any) -> Any:
+    return sys.modules["custom_components.evsemaster.session"]
+
+
+@pytest.fixture
+def cost_module(integration: Any) -> Any:
+    return sys.modules["custom_components.evsemaster.cost"]
+
+
+def _status(data_types: Any, charge_id: str, user_id: str) -> Any:
+    return data_types.ChargingStatus.model_construct(charge_id=charge_id, user_id=user_id)
+
+
+async def _load_tracker(hass: HomeAssistant, cost_module: Any, session: Any) -> Any:
+    tariff = cost_module.TimeOfUseTariff([(0, 0.25)])
+    tracker = cost_module.CostTracker(hass, ENTRY_ID, session, tariff=tariff)
+    await tracker.async_load()
+    return tracker
+
+
+async def _load_session(hass: HomeAssistant, session_module: Any) -> Any:
+    session = session_module.ChargingSession(hass, ENTRY_ID)
+    await session.async_load()
+    return session
+
+
+async def test_reload_keeps_plugged_in_session(
+    hass: HomeAssistant, session_module: Any
+) -> None:
+    session = await _load_session(hass, session_module)
+    session.async_update(100.0, False, None)
+    session.async_update(100.0, True, None)
+    assert session.async_update(103.5, True, None) == 3.5
+    await session.async_unload()
+
+    # an options change reloads the entry well within the store's save delay
+    reloaded = await _load_session(hass, session_module)
+    assert reloaded.started == session.started
+    assert reloaded.async_update(104.0, True, None) == 0.5
+    assert reloaded.energy_kwh == 4.0
+
+
+async def test_plug_in_starts_new_session(hass: HomeAssistant, session_module: Any) -> None:
+    session = await _load_session(hass, session_module)
+    session.async_update(100.0, True, None)
+    session.async_update(110.0, True, None)
+    first = session.started
+    session.async_update(110.0, False, None)
+    session.async_update(110.0, True, None)
+    assert session.started != first
+    assert session.energy_kwh == 0.0
+
+
+async def test_counter_drop_counts_from_zero(hass: HomeAssistant, session_module: Any) -> None:
+    session = await _load_session(hass, session_module)
+    session.async_update(1200.0, True, None)
+    assert session.async_update(1201.0, True, None) == 1.0
+    # the charger restarted its counter
+    assert session.async_update(0.5, True, None) == 0.5
+    assert session.energy_kwh == 1.5
+
+
+async def test_stale_charge_id_is_not_billed_to_its_user(
+    hass: HomeAssistant, session_module: Any, cost_module: Any, data_types: Any
+) -> None:
+    session = await _load_session(hass, session_module)
+    tracker = await _load_tracker(hass, cost_module, session)
+    session.async_update(100.0, False, _status(data_types, "41", "alice"))
+    # plugged in, but the EVSE still reports the previous session's charging status
+    tracker.async_update(session.async_update(102.0, True, _status(data_types, "41", "alice")))
+    tracker.async_update(session.async_update(104.0, True, _status(data_types, "41", "alice")))
+    assert session.user == session_module.UNKNOWN_USER
+    tracker.async_update(session.async_update(106.0, True, _status(data_types, "42", "bob")))
+
+    assert session.user == "bob"
+    assert tracker.users == {session_module.UNKNOWN_USER: 1.0, "bob": 0.5}
+    assert "alice" not in tracker.fleet.users
+    await session.async_unload()
+    await tracker.async_unload()
+
+
+async def test_reload_keeps_cost_totals(
+    hass: HomeAssistant, session_module: Any, cost_module: Any
+) -> None:
+    session = await _load_session(hass, session_module)
+    tracker = await _load_tracker(hass, cost_module, session)
+    session.async_update(100.0, True, None)
+    tracker.async_update(session.async_update(110.0, True, None))
+    assert tracker.total_cost == 2.5
+    await session.async_unload()
+    await tracker.async_unload()
+    assert tracker.fleet.total == 0.0
+
+    # reloaded before the delayed save would have run
+    session = await _load_session(hass, session_module)
+    tracker = await _load_tracker(hass, cost_module, session)
+    assert tracker.total_cost == 2.5
+    assert tracker.fleet.total == 2.5
+    tracker.async_update(session.async_update(112.0, True, None))
+    assert tracker.session_cost == 3.0
+    await session.async_unload()
+    await tracker.async_unload()
+
+
+async def test_day_rollover_resets_day_cost(
+    hass: HomeAssistant,
+    session_module: Any,
+    cost_module: Any,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    session = await _load_session(hass, session_module)
+    tracker = await _load_tracker(hass, cost_module, session)
+    session.async_update(100.0, True, None)
+    tracker.async_update(session.async_update(104.0, True, None))
+    assert tracker.day_cost == tracker.fleet.today == 1.0
+
+    freezer.tick(timedelta(days=1))
+    assert tracker.fleet.today == 0.0
+    tracker.async_update(session.async_update(106.0, True, None))
+    assert tracker.day_cost == tracker.fleet.today == 0.5
+    assert tracker.session_cost == tracker.total_cost == 1.5
+    await session.async_unload()
+    await tracker.async_unload()
+
+
+async def test_fleet_sensor_host_hands_over(hass: HomeAssistant, cost_module: Any) -> None:
+    fleet = cost_module.FleetCost()
+    added: list[str] = []
+    remove_first = fleet.async_add_host("first", lambda: added.append("first"))
+    remove_second = fleet.async_add_host("second", lambda: added.append("second"))
+    assert added == ["first"]
+
+    remove_first()
+    assert fleet.owner_entry_id == "second"
+    assert added == ["first", "second"]
+
+    remove_second()
+    assert fleet.owner_entry_id is None
+    fleet.async_add_host("third", lambda: added.append("third"))
+    assert added == ["first", "second", "third"]
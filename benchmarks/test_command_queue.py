@@ -0,0 +1,108 @@
+"""Offline command queue: collapsing, expiry, ordered replay and invalid commands."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+import sys
+from typing import Any
+
+from freezegun.api import FrozenDateTimeFactory
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+ENTRY_ID = "charger"
+
+
+@pytest.fixture
+def queue_module(integration: Any) -> Any:
+    return sys.modules["custom_components.evsemaster.command_queue"]
+
+
+class Recorder:
+    """Replay target recording commands, failing the ones it is told to."""
+
+    def __init__(self, failures: dict[str, Exception] | None = None) -> None:
+        self.failures = failures or {}
+        self.executed: list[tuple[str, dict[str, Any]]] = []
+
+    async def __call__(self, kind: str, args: dict[str, Any]) -> bool:
+        if kind in self.failures:
+            raise self.failures[kind]
+        self.executed.append((kind, args))
+        return True
+
+
+async def _queue(hass: HomeAssistant, queue_module: Any) -> Any:
+    queue = queue_module.EVSECommandQueue(hass, ENTRY_ID)
+    await queue.async_load()
+    return queue
+
+
+async def test_newer_commands_replace_older_ones(hass: HomeAssistant, queue_module: Any) -> None:
+    queue = await _queue(hass, queue_module)
+    await queue.async_enqueue(queue_module.COMMAND_START_CHARGING, {"max_amps": 16})
+    await queue.async_enqueue(queue_module.COMMAND_SET_MAX_AMPS, {"amperage": 10})
+    await queue.async_enqueue(queue_module.COMMAND_STOP_CHARGING, {})
+    await queue.async_enqueue(queue_module.COMMAND_SET_MAX_AMPS, {"amperage": 16})
+    await queue.async_enqueue(queue_module.COMMAND_SET_NICKNAME, {"nickname": "Garage"})
+
+    # survives a restart
+    queue = await _queue(hass, queue_module)
+    recorder = Recorder()
+    assert await queue.async_replay(recorder) == 3
+    assert recorder.executed == [
+        (queue_module.COMMAND_STOP_CHARGING, {}),
+        (queue_module.COMMAND_SET_MAX_AMPS, {"amperage": 16}),
+        (queue_module.COMMAND_SET_NICKNAME, {"nickname": "Garage"}),
+    ]
+    assert len(queue) == 0
+    assert queue.last_replay_latency is not None
+
+
+async def test_expired_commands_are_not_replayed(
+    hass: HomeAssistant, queue_module: Any, freezer: FrozenDateTimeFactory
+) -> None:
+    queue = await _queue(hass, queue_module)
+    await queue.async_enqueue(queue_module.COMMAND_START_CHARGING, {})
+    freezer.tick(queue_module.COMMAND_TTL - timedelta(minutes=1))
+    await queue.async_enqueue(queue_module.COMMAND_SET_NICKNAME, {"nickname": "Garage"})
+    freezer.tick(timedelta(minutes=2))
+
+    recorder = Recorder()
+    assert await queue.async_replay(recorder) == 1
+    assert recorder.executed == [(queue_module.COMMAND_SET_NICKNAME, {"nickname": "Garage"})]
+
+
+async def test_invalid_command_is_dropped_and_replay_continues(
+    hass: HomeAssistant, queue_module: Any
+) -> None:
+    queue = await _queue(hass, queue_module)
+    await queue.async_enqueue(queue_module.COMMAND_SET_MAX_AMPS, {"amperage": 40})
+    await queue.async_enqueue(queue_module.COMMAND_START_CHARGING, {})
+
+    recorder = Recorder({queue_module.COMMAND_SET_MAX_AMPS: ValueError("Amperage exceeds device max")})
+    assert await queue.async_replay(recorder) == 1
+    assert recorder.executed == [(queue_module.COMMAND_START_CHARGING, {})]
+    assert len(queue) == 0
+
+
+async def test_connectivity_error_keeps_the_rest_queued(
+    hass: HomeAssistant, queue_module: Any
+) -> None:
+    queue = await _queue(hass, queue_module)
+    await queue.async_enqueue(queue_module.COMMAND_SET_NICKNAME, {"nickname": "Garage"})
+    await queue.async_enqueue(queue_module.COMMAND_SET_MAX_AMPS, {"amperage": 16})
+    await queue.async_enqueue(queue_module.COMMAND_START_CHARGING, {})
+
+    recorder = Recorder({queue_module.COMMAND_SET_MAX_AMPS: queue_module.NotLoggedInError("logged out")})
+    assert await queue.async_replay(recorder) == 1
+    assert len(queue) == 2
+
+    # the link is back: the rest goes out in the original order
+    recorder = Recorder()
+    assert await queue.async_replay(recorder) == 2
+    assert [kind for kind, _ in recorder.executed] == [
+        queue_module.COMMAND_SET_MAX_AMPS,
+        queue_module.COMMAND_START_CHARGING,
+    ]
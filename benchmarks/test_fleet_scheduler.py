@@ -0,0 +1,215 @@
+"""Fleet scheduler against a simulated fleet of chargers."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import sys
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from conftest import benchmark
+
+FLEET_SIZES = (1, 10, 100)
+
+
+class SimulatedCharger:
+    """Charger whose start/stop commands immediately push the resulting status."""
+
+    def __init__(self, data_types: Any, index: int, max_active: int) -> None:
+        self.types = data_types
+        self.config_entry = SimpleNamespace(entry_id=f"sim{index:03d}")
+        self.data = SimpleNamespace(status=None)
+        self.departure_time: datetime | None = None
+        self.fleet_priority = 0
+        self.fleet_max_active = max_active
+        self.scheduler: Any = None
+        self.commands = 0
+        # EVSE that accepts the start command but never starts (offline, ignored)
+        self.ignores_start = False
+        self.push(data_types.CurrentStateEnum.NOT_CONNECTED, data_types.PlugStateEnum.DISCONNECTED)
+
+    @property
+    def charging(self) -> bool:
+        return self.data.status.current_state == self.types.CurrentStateEnum.CHARGING
+
+    def push(self, state: Any, plug: Any) -> None:
+        self.data.status = self.types.EvseStatus.model_construct(
+            current_state=state, plug_state=plug, current_power=0.0, total_kwh=0.0
+        )
+        if self.scheduler is not None:
+            self.scheduler.async_on_status(self)
+
+    def plug_in(self) -> None:
+        self.push(self.types.CurrentStateEnum.READY_TO_CHARGE, self.types.PlugStateEnum.CONNECTED_LOCKED)
+
+    def unplug(self) -> None:
+        self.push(self.types.CurrentStateEnum.NOT_CONNECTED, self.types.PlugStateEnum.DISCONNECTED)
+
+    async def async_start_charging(self) -> bool:
+        self.commands += 1
+        if self.ignores_start:
+            return True
+        self.push(self.types.CurrentStateEnum.CHARGING, self.types.PlugStateEnum.CONNECTED_LOCKED)
+        return True
+
+    async def async_stop_charging(self) -> bool:
+        self.commands += 1
+        self.push(self.types.CurrentStateEnum.COMPLETED, self.types.PlugStateEnum.CONNECTED_LOCKED)
+        return True
+
+
+@pytest.fixture
+def make_scheduled_fleet(hass: HomeAssistant, integration: Any, data_types: Any) -> Any:
+    scheduler_module = sys.modules["custom_components.evsemaster.scheduler"]
+    created: list[tuple[Any, list[SimulatedCharger]]] = []
+
+    def _make(count: int, max_active: int) -> tuple[Any, list[SimulatedCharger]]:
+        scheduler = scheduler_module.FleetChargingScheduler(hass)
+        fleet = [SimulatedCharger(data_types, i, max_active) for i in range(count)]
+        for charger in fleet:
+            scheduler.async_register(charger)
+        created.append((scheduler, fleet))
+        return scheduler, fleet
+
+    yield _make
+
+    for scheduler, fleet in created:
+        for charger in fleet:
+            scheduler.async_unregister(charger)
+
+
+def _charging(fleet: list[SimulatedCharger]) -> set[str]:
+    return {c.config_entry.entry_id for c in fleet if c.charging}
+
+
+async def test_cap_and_priority(hass: HomeAssistant, make_scheduled_fleet: Any) -> None:
+    scheduler, fleet = make_scheduled_fleet(10, max_active=3)
+    fleet[7].fleet_priority = 5
+    fleet[4].departure_time = datetime(2026, 1, 1, 7, tzinfo=timezone.utc)
+    for charger in fleet:
+        charger.plug_in()
+    await hass.async_block_till_done()
+
+    # manual priority first, then deadline, then arrival order
+    assert _charging(fleet) == {"sim007", "sim004", "sim000"}
+
+    fleet[7].unplug()
+    await hass.async_block_till_done()
+    assert _charging(fleet) == {"sim004", "sim000", "sim001"}
+
+
+async def test_rotation_is_fair(hass: HomeAssistant, make_scheduled_fleet: Any) -> None:
+    scheduler, fleet = make_scheduled_fleet(4, max_active=2)
+    for charger in fleet:
+        charger.plug_in()
+    await hass.async_block_till_done()
+    first = _charging(fleet)
+    assert len(first) == 2
+
+    for vehicle in scheduler._vehicles.values():
+        if vehicle.active_since is not None:
+            vehicle.active_since -= timedelta(hours=1).total_seconds()
+    scheduler._async_rotate()
+    await hass.async_block_till_done()
+
+    second = _charging(fleet)
+    assert len(second) == 2
+    assert first.isdisjoint(second)
+
+
+async def test_rotation_keeps_earlier_departure(
+    hass: HomeAssistant, make_scheduled_fleet: Any
+) -> None:
+    scheduler, fleet = make_scheduled_fleet(3, max_active=2)
+    fleet[0].departure_time = fleet[1].departure_time = datetime(2026, 1, 1, 9, tzinfo=timezone.utc)
+    fleet[2].departure_time = datetime(2026, 1, 1, 7, tzinfo=timezone.utc)
+    for charger in fleet:
+        charger.plug_in()
+    await hass.async_block_till_done()
+    assert _charging(fleet) == {"sim002", "sim000"}
+
+    for vehicle in scheduler._vehicles.values():
+        if vehicle.active_since is not None:
+            vehicle.active_since -= timedelta(hours=1).total_seconds()
+    scheduler._async_rotate()
+    await hass.async_block_till_done()
+
+    # the earliest departure keeps its slot; the tied pair takes turns
+    assert _charging(fleet) == {"sim002", "sim001"}
+
+
+async def test_start_that_never_takes_is_retried_then_released(
+    hass: HomeAssistant, make_scheduled_fleet: Any
+) -> None:
+    scheduler_module = sys.modules["custom_components.evsemaster.scheduler"]
+    scheduler, fleet = make_scheduled_fleet(2, max_active=1)
+    fleet[0].ignores_start = True
+    for charger in fleet:
+        charger.plug_in()
+    await hass.async_block_till_done()
+    assert _charging(fleet) == set()
+
+    vehicle = scheduler._vehicles["sim000"]
+    for _ in range(scheduler_module.MAX_START_ATTEMPTS):
+        vehicle.commanded_at -= scheduler.start_timeout
+        scheduler._async_check()
+        await hass.async_block_till_done()
+
+    assert fleet[0].commands == scheduler_module.MAX_START_ATTEMPTS
+    assert _charging(fleet) == {"sim001"}
+
+
+async def test_stop_outside_scheduler_releases_slot(
+    hass: HomeAssistant, make_scheduled_fleet: Any, data_types: Any
+) -> None:
+    scheduler, fleet = make_scheduled_fleet(2, max_active=1)
+    for charger in fleet:
+        charger.plug_in()
+    await hass.async_block_till_done()
+    assert _charging(fleet) == {"sim000"}
+
+    # stop pressed on the EVSE: the slot moves on and sim000 is not restarted
+    fleet[0].push(data_types.CurrentStateEnum.COMPLETED, data_types.PlugStateEnum.CONNECTED_LOCKED)
+    await hass.async_block_till_done()
+    assert _charging(fleet) == {"sim001"}
+    assert fleet[0].commands == 1
+
+
+async def test_full_vehicle_frees_slot(
+    hass: HomeAssistant, make_scheduled_fleet: Any, data_types: Any
+) -> None:
+    scheduler, fleet = make_scheduled_fleet(3, max_active=1)
+    for charger in fleet:
+        charger.plug_in()
+    await hass.async_block_till_done()
+    assert _charging(fleet) == {"sim000"}
+
+    fleet[0].push(data_types.CurrentStateEnum.COMPLETED_FULL_CHARGE, data_types.PlugStateEnum.CONNECTED_LOCKED)
+    await hass.async_block_till_done()
+    assert _charging(fleet) == {"sim001"}
+
+
+@pytest.mark.parametrize("chargers", FLEET_SIZES)
+async def test_push_reaction_throughput(
+    hass: HomeAssistant, make_scheduled_fleet: Any, chargers: int
+) -> None:
+    """Plug/unplug churn across the fleet; the cap must hold after every push."""
+    cap = max(chargers // 4, 1)
+    scheduler, fleet = make_scheduled_fleet(chargers, max_active=cap)
+    rounds = max(2000 // chargers, 2)
+
+    async def run() -> int:
+        events = 0
+        for tick in range(rounds):
+            for charger in fleet[tick % 2 :: 2]:
+                charger.plug_in() if tick % 4 < 2 else charger.unplug()
+                events += 1
+            await hass.async_block_till_done()
+            assert len(_charging(fleet)) <= cap
+        return events
+
+    await benchmark(f"fleet_scheduler_push[{chargers}]", run)
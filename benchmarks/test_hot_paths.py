@@ -0,0 +1,158 @@
+"""Hot-path benchmarks for the coordinator and entities."""
+
+from __future__ import annotations
+
+from itertools import islice
+import sys
+from typing import Any
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from conftest import benchmark
+from synthetic import device_info, event_stream, status_stream
+
+FLEET_SIZES = (1, 10, 100)
+# total events per pass, spread over the fleet
+EVENTS = 20_000
+# let queued event tasks run every this many events
+DRAIN_EVERY = 200
+
+
+def _entities(coordinator: Any) -> list[tuple[Any, str]]:
+    """Every entity of a charger, paired with the state property HA reads."""
+    modules = {
+        name: sys.modules[f"custom_components.evsemaster.{name}"]
+        for name in ("sensor", "binary_sensor", "button", "number", "text", "datetime")
+    }
+    entities = [
+        (modules["sensor"].EVSEMasterSensor(coordinator, d), "native_value")
+        for d in modules["sensor"].SENSORS
+    ]
+    entities += [
+        (modules["binary_sensor"].EVSEMasterBinarySensor(coordinator, d), "is_on")
+        for d in modules["binary_sensor"].BINARY_SENSORS
+    ]
+    entities += [
+        (modules["button"].EVSEMasterButton(coordinator, d), "available")
+        for d in modules["button"].BUTTONS
+    ]
+    entities += [
+        (modules["number"].EVSEMasterNumber(coordinator, modules["number"].MAX_AMPS), "native_value"),
+        (modules["number"].EVSEEnergyTargetNumber(coordinator, modules["number"].ENERGY_TARGET), "native_value"),
+        (modules["datetime"].EVSEDepartureDateTime(coordinator, modules["datetime"].DEPARTURE_TIME), "native_value"),
+    ]
+    entities += [
+        (modules["text"].EVSEMasterText(coordinator, d), "native_value")
+        for d in modules["text"].TEXTS
+    ]
+    return entities
+
+
+def _attach_entities(coordinator: Any) -> int:
+    """Subscribe every entity the way CoordinatorEntity does, minus the state machine write."""
+    entities = _entities(coordinator)
+    for entity, prop in entities:
+
+        def _update(entity: Any = entity, prop: str = prop) -> None:
+            entity._async_update_attrs()
+            getattr(entity, prop)
+
+        coordinator.async_add_listener(_update)
+    return len(entities)
+
+
+@pytest.mark.parametrize("chargers", FLEET_SIZES)
+async def test_protocol_event_pipeline(
+    hass: HomeAssistant, make_fleet: Any, data_types: Any, chargers: int
+) -> None:
+    """_on_protocol_event end to end: parse, predictor, listeners, entity fan-out."""
+    fleet = make_fleet(chargers)
+    for coordinator in fleet:
+        _attach_entities(coordinator)
+    streams = [event_stream(data_types, i, seed=i) for i in range(chargers)]
+    per_charger = EVENTS // chargers
+
+    async def run() -> int:
+        for tick in range(per_charger):
+            for coordinator, stream in zip(fleet, streams):
+                coordinator._on_protocol_event(*next(stream))
+            if tick % DRAIN_EVERY == 0:
+                await hass.async_block_till_done()
+        await hass.async_block_till_done()
+        return per_charger * chargers
+
+    await benchmark(f"protocol_event_pipeline[{chargers}]", run)
+
+
+@pytest.mark.parametrize("chargers", FLEET_SIZES)
+async def test_ensure_serial(
+    hass: HomeAssistant, make_fleet: Any, data_types: Any, chargers: int
+) -> None:
+    """_ensure_serial with the serial unchanged (the common case) and occasionally changed."""
+    fleet = make_fleet(chargers)
+    per_charger = EVENTS // chargers
+    alternate = [device_info(data_types, i + 100_000) for i in range(chargers)]
+    original = [c.proto.device for c in fleet]
+
+    async def run() -> int:
+        for tick in range(per_charger):
+            swap = tick % 1000 == 999
+            for i, coordinator in enumerate(fleet):
+                if swap:
+                    coordinator.proto.device = alternate[i]
+                coordinator._ensure_serial()
+                if swap:
+                    coordinator.proto.device = original[i]
+                    coordinator._ensure_serial()
+        return per_charger * chargers
+
+    await benchmark(f"ensure_serial[{chargers}]", run)
+
+
+@pytest.mark.parametrize("chargers", FLEET_SIZES)
+async def test_set_updated_data_fanout(
+    hass: HomeAssistant, make_fleet: Any, data_types: Any, chargers: int
+) -> None:
+    """async_set_updated_data fanning out to every entity of every charger."""
+    fleet = make_fleet(chargers)
+    for coordinator in fleet:
+        _attach_entities(coordinator)
+    statuses = [status_stream(data_types, seed=i) for i in range(chargers)]
+    per_charger = EVENTS // chargers
+
+    async def run() -> int:
+        for _ in range(per_charger):
+            for coordinator, stream in zip(fleet, statuses):
+                coordinator.data.status = next(stream)
+                coordinator.async_set_updated_data(coordinator.data)
+        # let the queued state writes land so they don't count as net growth
+        await hass.async_block_till_done()
+        return per_charger * chargers
+
+    await benchmark(f"set_updated_data_fanout[{chargers}]", run)
+
+
+@pytest.mark.parametrize("chargers", FLEET_SIZES)
+async def test_entity_state_reads(
+    hass: HomeAssistant, make_fleet: Any, data_types: Any, chargers: int
+) -> None:
+    """Every entity's state property against a changing snapshot, per entity read."""
+    fleet = make_fleet(chargers)
+    entities = [(c, _entities(c)) for c in fleet]
+    statuses = [list(islice(status_stream(data_types, seed=i), 600)) for i in range(chargers)]
+    per_charger = max(EVENTS // chargers // 20, 1)
+
+    async def run() -> int:
+        reads = 0
+        for tick in range(per_charger):
+            for (coordinator, charger_entities), samples in zip(entities, statuses):
+                coordinator.data.status = samples[tick % len(samples)]
+                for entity, prop in charger_entities:
+                    entity._async_update_attrs()
+                    getattr(entity, prop)
+                reads += len(charger_entities)
+        return reads
+
+    await benchmark(f"entity_state_reads[{chargers}]", run)
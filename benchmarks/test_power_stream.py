@@ -0,0 +1,67 @@
+"""Live power websocket subscription against a simulated charger."""
+
+from __future__ import annotations
+
+import json
+import logging
+import sys
+from typing import Any
+
+from homeassistant.components.websocket_api import ActiveConnection
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.setup import async_setup_component
+
+from synthetic import status_stream
+
+
+def _decode(message: Any) -> dict[str, Any]:
+    return message if isinstance(message, dict) else json.loads(message)
+
+
+async def test_stream_ends_when_entry_unloads(
+    hass: HomeAssistant,
+    make_fleet: Any,
+    integration: Any,
+    data_types: Any,
+    hass_admin_user: Any,
+) -> None:
+    assert await async_setup_component(hass, "websocket_api", {})
+    websocket_module = sys.modules["custom_components.evsemaster.websocket_api"]
+    coordinator = make_fleet(1)[0]
+    entry = coordinator.config_entry
+    entry.mock_state(hass, ConfigEntryState.LOADED)
+    entry.runtime_data = coordinator
+    device = dr.async_get(hass).async_get_or_create(
+        config_entry_id=entry.entry_id,
+        identifiers={(integration.DOMAIN, coordinator.data.device.serial_number)},
+    )
+
+    sent: list[dict[str, Any]] = []
+    refresh_token = await hass.auth.async_create_refresh_token(
+        hass_admin_user, "https://example.com/"
+    )
+    connection = ActiveConnection(
+        logging.getLogger(__name__),
+        hass,
+        lambda message: sent.append(_decode(message)),
+        hass_admin_user,
+        refresh_token,
+    )
+    websocket_module.ws_subscribe_power(
+        hass,
+        connection,
+        {"id": 1, "type": websocket_module.WS_TYPE_SUBSCRIBE_POWER, "device_id": device.id, "min_interval": 0.05},
+    )
+    assert sent[-1]["success"]
+
+    coordinator._on_protocol_event(data_types.EvseStatus.__name__, next(status_stream(data_types, 0)))
+    await hass.async_block_till_done()
+    assert sent[-1]["type"] == "event"
+
+    # an options change reloads the entry and throws this coordinator away
+    await coordinator.async_shutdown()
+    assert sent[-1]["type"] == "result" and not sent[-1]["success"]
+    assert 1 not in connection.subscriptions
+    assert not coordinator._status_listeners
@@ -0,0 +1,205 @@
+"""Session proxy against a simulated charger on the loopback interface."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+import sys
+from typing import Any
+
+import pytest
+
+PASSWORD = "123456"
+SERIAL = bytes.fromhex("0123456789abcdef")
+
+
+class _Socket(asyncio.DatagramProtocol):
+    def __init__(self, on_datagram: Callable[[bytes, tuple[str, int]], None]) -> None:
+        self.on_datagram = on_datagram
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        self.on_datagram(data, addr)
+
+
+class SimulatedCharger:
+    """EVSE that answers requests and pushes status after the login confirm."""
+
+    def __init__(self, proxy: Any) -> None:
+        self.proxy = proxy
+        self.commands = proxy.CommandEnum
+        self.received: list[int] = []
+        self.transport: asyncio.DatagramTransport | None = None
+
+    @property
+    def port(self) -> int:
+        return self.transport.get_extra_info("sockname")[1]
+
+    def datagram(self, command: int, payload: bytes = b"") -> bytes:
+        return self.proxy.encode_datagram(
+            self.proxy.Datagram(0, SERIAL, PASSWORD.encode(), command, payload)
+        )
+
+    def push(self, command: int) -> None:
+        self.transport.sendto(self.datagram(command), self.session)
+
+    def on_datagram(self, data: bytes, addr: tuple[str, int]) -> None:
+        command = self.proxy.decode_datagram(data).command
+        self.received.append(command)
+        self.session = addr
+        if command == self.commands.LOGIN_REQUEST:
+            self.push(self.commands.LOGIN_SUCCESS_EVENT)
+        elif command == self.commands.LOGIN_CONFIRM_RESPONSE:
+            # a real EVSE follows the confirm with one of these
+            self.push(self.commands.NOT_LOGGED_IN_EVENT)
+            self.push(self.commands.CURRENT_STATUS_EVENT)
+            self.push(self.commands.CURRENT_CHARGING_STATUS_EVENT)
+        elif command & 0x8000 and command not in self.proxy.ACK_PUSHES:
+            self.push(command & ~0x8000)
+
+
+class Client:
+    """Local app talking to the proxy."""
+
+    def __init__(self, proxy: Any, address: tuple[str, int]) -> None:
+        self.proxy = proxy
+        self.address = address
+        self.received: list[int] = []
+        self.transport: asyncio.DatagramTransport | None = None
+
+    def on_datagram(self, data: bytes, addr: tuple[str, int]) -> None:
+        self.received.append(self.proxy.decode_datagram(data).command)
+
+    def send(self, command: int, payload: bytes = b"") -> None:
+        self.transport.sendto(
+            self.proxy.encode_datagram(
+                self.proxy.Datagram(0, SERIAL, PASSWORD.encode(), command, payload)
+            ),
+            self.address,
+        )
+
+
+async def _until(condition: Callable[[], bool]) -> None:
+    async with asyncio.timeout(5):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def proxy_module(integration: Any) -> Any:
+    return sys.modules["custom_components.evsemaster.proxy"]
+
+
+@asynccontextmanager
+async def _session(proxy_module: Any) -> AsyncIterator[tuple[Any, SimulatedCharger, Client, Client]]:
+    """Proxy in front of a simulated charger, with HA logged in and a second app client."""
+    loop = asyncio.get_running_loop()
+    commands = proxy_module.CommandEnum
+    charger = SimulatedCharger(proxy_module)
+    charger.transport, _ = await loop.create_datagram_endpoint(
+        lambda: _Socket(charger.on_datagram), local_addr=("127.0.0.1", 0)
+    )
+    proxy = proxy_module.EVSESessionProxy(
+        "127.0.0.1", PASSWORD, "127.0.0.1", 0, charger_port=charger.port
+    )
+    await proxy.async_start()
+    clients = [Client(proxy_module, ("127.0.0.1", proxy.listen_port)) for _ in range(2)]
+    for client in clients:
+        client.transport, _ = await loop.create_datagram_endpoint(
+            lambda client=client: _Socket(client.on_datagram), local_addr=("127.0.0.1", 0)
+        )
+    ha, app = clients
+    try:
+        ha.send(commands.LOGIN_REQUEST)
+        await _until(lambda: commands.LOGIN_SUCCESS_EVENT in ha.received)
+        ha.send(commands.LOGIN_CONFIRM_RESPONSE)
+        await _until(lambda: commands.CURRENT_CHARGING_STATUS_EVENT in ha.received)
+        await _until(lambda: proxy.session_alive)
+        yield proxy, charger, ha, app
+    finally:
+        for client in clients:
+            client.transport.close()
+        await proxy.async_stop()
+        charger.transport.close()
+
+
+@pytest.mark.usefixtures("socket_enabled")
+async def test_second_client_shares_session(proxy_module: Any) -> None:
+    """HA and a second app share one login; acks go up once, commands in order."""
+    commands = proxy_module.CommandEnum
+    async with _session(proxy_module) as (proxy, charger, ha, app):
+        clients = (ha, app)
+
+        # the second client is logged in from the cache, without a new upstream login
+        app.send(commands.LOGIN_REQUEST)
+        await _until(lambda: commands.LOGIN_SUCCESS_EVENT in app.received)
+        app.send(commands.LOGIN_CONFIRM_RESPONSE)
+        await _until(lambda: commands.CURRENT_CHARGING_STATUS_EVENT in app.received)
+        assert commands.CURRENT_STATUS_EVENT in app.received
+        assert commands.NOT_LOGGED_IN_EVENT not in app.received
+        assert charger.received.count(commands.LOGIN_REQUEST) == 1
+        assert charger.received.count(commands.LOGIN_CONFIRM_RESPONSE) == 1
+
+        # both clients acknowledge the pushes; the EVSE sees each ack once
+        for client in clients:
+            client.send(commands.CURRENT_STATUS_RESPONSE)
+            client.send(commands.CURRENT_CHARGING_STATUS_RESPONSE)
+        await _until(lambda: commands.CURRENT_CHARGING_STATUS_RESPONSE in charger.received)
+        await asyncio.sleep(0.1)
+        assert charger.received.count(commands.CURRENT_STATUS_RESPONSE) == 1
+        assert charger.received.count(commands.CURRENT_CHARGING_STATUS_RESPONSE) == 1
+
+        # interleaved commands reach the EVSE in arrival order
+        ha.send(commands.NICKNAME_REQUEST)
+        app.send(commands.CHARGE_START_REQUEST)
+        ha.send(commands.OUTPUT_AMPERAGE_REQUEST)
+        app.send(commands.CHARGE_STOP_REQUEST)
+        await _until(lambda: commands.CHARGE_STOP_REQUEST in charger.received)
+        forwarded = [c for c in charger.received if c in (
+            commands.NICKNAME_REQUEST,
+            commands.CHARGE_START_REQUEST,
+            commands.OUTPUT_AMPERAGE_REQUEST,
+            commands.CHARGE_STOP_REQUEST,
+        )]
+        assert forwarded == [
+            commands.NICKNAME_REQUEST,
+            commands.CHARGE_START_REQUEST,
+            commands.OUTPUT_AMPERAGE_REQUEST,
+            commands.CHARGE_STOP_REQUEST,
+        ]
+        # replies are fanned out to every client
+        await _until(lambda: commands.CHARGE_STOP_RESPONSE in app.received)
+        assert commands.CHARGE_START_RESPONSE in ha.received
+
+
+@pytest.mark.usefixtures("socket_enabled")
+async def test_reads_are_answered_from_the_cache(proxy_module: Any) -> None:
+    """Status polls and setting reads don't go upstream or hold the command queue."""
+    commands = proxy_module.CommandEnum
+    get = bytes((commands.GET_ACTION,))
+    set_ = bytes((commands.SET_ACTION,))
+    async with _session(proxy_module) as (proxy, charger, ha, app):
+        app.send(commands.CURRENT_STATUS_EVENT)
+        await _until(lambda: app.received.count(commands.CURRENT_STATUS_EVENT) == 1)
+        assert commands.CURRENT_STATUS_EVENT not in charger.received
+
+        # the first read goes to the EVSE, the next ones are answered by the proxy
+        ha.send(commands.NICKNAME_REQUEST, get)
+        await _until(lambda: commands.NICKNAME_EVENT in ha.received)
+        app.send(commands.NICKNAME_REQUEST, get)
+        await _until(lambda: commands.NICKNAME_EVENT in app.received)
+        assert charger.received.count(commands.NICKNAME_REQUEST) == 1
+
+        # a set goes upstream, and the read after it asks the EVSE again
+        app.send(commands.NICKNAME_REQUEST, set_)
+        app.send(commands.NICKNAME_REQUEST, get)
+        await _until(lambda: charger.received.count(commands.NICKNAME_REQUEST) == 3)
+        app.send(commands.NICKNAME_REQUEST, get)
+        await _until(lambda: app.received.count(commands.NICKNAME_EVENT) == 4)
+        await asyncio.sleep(0.1)
+        assert charger.received.count(commands.NICKNAME_REQUEST) == 3
+
+
+def test_proxy_refuses_protocol_port(proxy_module: Any) -> None:
+    with pytest.raises(ValueError):
+        proxy_module.EVSESessionProxy("127.0.0.1", PASSWORD, "0.0.0.0", proxy_module.APP_PORT)
@@ -2,24 +2,58 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import partial
+
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
     BinarySensorEntity,
+    BinarySensorEntityDescription,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .coordinator import EVSEMasterDataUpdateCoordinator, DataSchema
+from .entity import EVSEMasterEntity, always, async_add_reported_entities
 from .evse_loader import data_types
 
 # Import specific classes from the modules
-EvseStatus = data_types.EvseStatus
 PlugStateEnum = data_types.PlugStateEnum
 CurrentStateEnum = data_types.CurrentStateEnum
 
 
+@dataclass(frozen=True, kw_only=True)
+class EVSEMasterBinarySensorEntityDescription(BinarySensorEntityDescription):
+    """Describes an EVSEMaster binary sensor."""
+
+    is_on_fn: Callable[[EVSEMasterDataUpdateCoordinator], bool]
+    exists_fn: Callable[[DataSchema], bool] = always
+
+
+BINARY_SENSORS: tuple[EVSEMasterBinarySensorEntityDescription, ...] = (
+    EVSEMasterBinarySensorEntityDescription(
+        key="plug_state_binary",
+        translation_key="plug_state",
+        device_class=BinarySensorDeviceClass.PLUG,
+        is_on_fn=lambda coordinator: (
+            coordinator.data.status is not None
+            and coordinator.data.status.plug_state != PlugStateEnum.DISCONNECTED
+        ),
+    ),
+    EVSEMasterBinarySensorEntityDescription(
+        key="charging_binary",
+        translation_key="charging_state",
+        device_class=BinarySensorDeviceClass.BATTERY_CHARGING,
+        is_on_fn=lambda coordinator: (
+            coordinator.data.status is not None
+            and coordinator.data.status.current_state == CurrentStateEnum.CHARGING
+        ),
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -28,55 +62,19 @@ async def async_setup_entry(
     """Set up minimal binary sensors: plugged-in and charging."""
     coordinator: EVSEMasterDataUpdateCoordinator = entry.runtime_data
 
-    entities: list[BinarySensorEntity] = []
-    entities.append(EVSEPluggedInBinarySensor(coordinator))
-    entities.append(EVSEChargingBinarySensor(coordinator))
-
-    async_add_entities(entities)
-
-
-class _Base(CoordinatorEntity[EVSEMasterDataUpdateCoordinator]):
-    _attr_has_entity_name = True
-
-    def __init__(self, coordinator: EVSEMasterDataUpdateCoordinator) -> None:
-        super().__init__(coordinator)
-        self._attr_device_info = coordinator.data.device.get_attr_device_info()
-
-    @property
-    def entry(self) -> DataSchema:
-        return self.coordinator.data
-
-
-class EVSEPluggedInBinarySensor(_Base, BinarySensorEntity):
-    _attr_translation_key = "plug_state"
-    _attr_device_class = BinarySensorDeviceClass.PLUG
-
-
-    def __init__(self, coordinator: EVSEMasterDataUpdateCoordinator) -> None:
-        super().__init__(coordinator)
-        serial = self.entry.device.serial_number
-        self._attr_unique_id = f"{serial}_plug_state_binary"
-
-    @property
-    def is_on(self) -> bool:
-        status: EvseStatus | None = self.entry.status
-        if status:
-            return status.plug_state != PlugStateEnum.DISCONNECTED
-        return False
+    async_add_reported_entities(
+        coordinator,
+        BINARY_SENSORS,
+        partial(EVSEMasterBinarySensor, coordinator),
+        async_add_entities,
+    )
 
 
-class EVSEChargingBinarySensor(_Base, BinarySensorEntity):
-    _attr_translation_key = "charging_state"
-    _attr_device_class = BinarySensorDeviceClass.BATTERY_CHARGING
+class EVSEMasterBinarySensor(EVSEMasterEntity, BinarySensorEntity):
+    """Binary sensor backed by a state accessor from its description."""
 
-    def __init__(self, coordinator: EVSEMasterDataUpdateCoordinator) -> None:
-        super().__init__(coordinator)
-        serial = self.entry.device.serial_number
-        self._attr_unique_id = f"{serial}_charging_binary"
+    entity_description: EVSEMasterBinarySensorEntityDescription
 
-    @property
-    def is_on(self) -> bool:
-        status: EvseStatus | None = self.entry.status
-        if status:
-            return status.current_state == CurrentStateEnum.CHARGING
-        return False
+    @callback
+    def _async_update_attrs(self) -> None:
+        self._attr_is_on = self.entity_description.is_on_fn(self.coordinator)
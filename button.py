@@ -2,25 +2,56 @@
 
 from __future__ import annotations
 
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
 import logging
-import voluptuous as vol
+from typing import Any
 
-from homeassistant.components.button import ButtonEntity
+from homeassistant.components.button import ButtonEntity, ButtonEntityDescription
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers import config_validation as cv
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .coordinator import EVSEMasterDataUpdateCoordinator, DataSchema
+from .coordinator import EVSEMasterDataUpdateCoordinator
+from .entity import EVSEMasterEntity, status_value
 from .evse_loader import data_types
 
 # Import specific classes from the modules
-EvseStatus = data_types.EvseStatus
 CurrentStateEnum = data_types.CurrentStateEnum
 
 _LOGGER = logging.getLogger(__name__)
 
+_current_state = status_value("current_state")
+
+
+@dataclass(frozen=True, kw_only=True)
+class EVSEMasterButtonEntityDescription(ButtonEntityDescription):
+    """Describes an EVSEMaster button."""
+
+    available_fn: Callable[[EVSEMasterDataUpdateCoordinator], bool]
+    press_fn: Callable[[EVSEMasterDataUpdateCoordinator], Awaitable[Any]]
+
+
+BUTTONS: tuple[EVSEMasterButtonEntityDescription, ...] = (
+    EVSEMasterButtonEntityDescription(
+        key="start_charging_button",
+        translation_key="start_charging",
+        icon="mdi:play",
+        available_fn=lambda coordinator: (
+            (state := _current_state(coordinator)) is not None
+            and state != CurrentStateEnum.CHARGING
+        ),
+        press_fn=lambda coordinator: coordinator.async_start_charging(),
+    ),
+    EVSEMasterButtonEntityDescription(
+        key="stop_charging_button",
+        translation_key="stop_charging",
+        icon="mdi:stop",
+        available_fn=lambda coordinator: _current_state(coordinator) == CurrentStateEnum.CHARGING,
+        press_fn=lambda coordinator: coordinator.async_stop_charging(),
+    ),
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -30,69 +61,23 @@ async def async_setup_entry(
     """Set up start/stop charging buttons in minimal style."""
     coordinator: EVSEMasterDataUpdateCoordinator = entry.runtime_data
 
-    entities: list[ButtonEntity] = []
-    entities.append(EVSEStartChargingButton(coordinator))
-    entities.append(EVSEStopChargingButton(coordinator))
-
-    async_add_entities(entities)
+    async_add_entities(
+        EVSEMasterButton(coordinator, description) for description in BUTTONS
+    )
 
 
-class _BaseButton(CoordinatorEntity[EVSEMasterDataUpdateCoordinator]):
-    _attr_has_entity_name = True
+class EVSEMasterButton(EVSEMasterEntity, ButtonEntity):
+    """Button running the coordinator command from its description."""
 
-    def __init__(self, coordinator: EVSEMasterDataUpdateCoordinator) -> None:
-        super().__init__(coordinator)
-        self._attr_device_info = coordinator.data.device.get_attr_device_info()
+    entity_description: EVSEMasterButtonEntityDescription
 
-    @property
-    def entry(self) -> DataSchema:
-        return self.coordinator.data
-
-
-class EVSEStartChargingButton(_BaseButton, ButtonEntity):
-    _attr_translation_key = "start_charging"
-    _attr_icon = "mdi:play"
-
-    def __init__(self, coordinator: EVSEMasterDataUpdateCoordinator) -> None:
-        super().__init__(coordinator)
-        serial = self.entry.device.serial_number
-        self._attr_unique_id = f"{serial}_start_charging_button"
-
-    @property
-    def available(self) -> bool:
-        status: EvseStatus | None = self.entry.status
-        if status and status.current_state is not None:
-            return status.current_state != CurrentStateEnum.CHARGING
-        return False
-
-    async def async_press(
-        self,
-        max_amps: int | None = None,
-        duration_hours: float | None = None,
-        start_datetime: str | None = None,
-    ) -> None:
-        await self.coordinator.async_start_charging(
-            max_amps,
-            start_datetime,
-            duration_hours,
-        )
-
-
-class EVSEStopChargingButton(_BaseButton, ButtonEntity):
-    _attr_translation_key = "stop_charging"
-    _attr_icon = "mdi:stop"
-
-    def __init__(self, coordinator: EVSEMasterDataUpdateCoordinator) -> None:
-        super().__init__(coordinator)
-        serial = self.entry.device.serial_number
-        self._attr_unique_id = f"{serial}_stop_charging_button"
+    @callback
+    def _async_update_attrs(self) -> None:
+        self._data_available = self.entity_description.available_fn(self.coordinator)
 
     @property
     def available(self) -> bool:
-        status: EvseStatus | None = self.entry.status
-        if status and status.current_state is not None:
-            return status.current_state == CurrentStateEnum.CHARGING
-        return False
+        return self._data_available
 
     async def async_press(self) -> None:
-        await self.coordinator.async_stop_charging()
+        await self.entity_description.press_fn(self.coordinator)
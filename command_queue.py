@@ -0,0 +1,126 @@
+"""Persistent queue for EVSE commands issued while the charger is offline."""
+
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .evse_loader import data_types
+
+# Import specific classes from the modules
+NotLoggedInError = data_types.NotLoggedInError
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+COMMAND_TTL = timedelta(hours=2)
+
+# errors meaning the EVSE can't be reached right now, as opposed to a bad command
+CONNECTIVITY_ERRORS: tuple[type[Exception], ...] = (NotLoggedInError, OSError, TimeoutError)
+
+COMMAND_START_CHARGING = "start_charging"
+COMMAND_STOP_CHARGING = "stop_charging"
+COMMAND_SET_MAX_AMPS = "set_max_amps"
+COMMAND_SET_NICKNAME = "set_nickname"
+
+# queued commands a new command makes pointless
+SUPERSEDES: dict[str, frozenset[str]] = {
+    COMMAND_START_CHARGING: frozenset({COMMAND_START_CHARGING, COMMAND_STOP_CHARGING}),
+    COMMAND_STOP_CHARGING: frozenset({COMMAND_START_CHARGING, COMMAND_STOP_CHARGING}),
+    COMMAND_SET_MAX_AMPS: frozenset({COMMAND_SET_MAX_AMPS}),
+    COMMAND_SET_NICKNAME: frozenset({COMMAND_SET_NICKNAME}),
+}
+
+
+class EVSECommandQueue:
+    """Commands kept in HA storage until the charger can be reached again."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, ttl: timedelta = COMMAND_TTL) -> None:
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.command_queue"
+        )
+        self.ttl = ttl
+        self._commands: list[dict[str, Any]] = []
+        self.last_replay: datetime | None = None
+        self.last_replay_latency: float | None = None
+
+    def __len__(self) -> int:
+        return len(self._commands)
+
+    async def async_load(self) -> None:
+        """Load commands queued before the last restart."""
+        data = await self._store.async_load()
+        if data:
+            self._commands = data.get("commands", [])
+
+    async def _async_save(self) -> None:
+        await self._store.async_save({"commands": self._commands})
+
+    def _prune_expired(self, now: datetime) -> None:
+        fresh = [c for c in self._commands if dt_util.parse_datetime(c["expires_at"]) > now]
+        if len(fresh) != len(self._commands):
+            _LOGGER.warning(
+                "Dropping %d expired EVSE command(s)", len(self._commands) - len(fresh)
+            )
+            self._commands = fresh
+
+    async def async_enqueue(self, kind: str, args: dict[str, Any]) -> None:
+        """Queue a command, replacing any queued command it supersedes."""
+        now = dt_util.utcnow()
+        superseded = SUPERSEDES.get(kind, frozenset({kind}))
+        self._commands = [c for c in self._commands if c["kind"] not in superseded]
+        self._prune_expired(now)
+        self._commands.append(
+            {
+                "kind": kind,
+                "args": args,
+                "queued_at": now.isoformat(),
+                "expires_at": (now + self.ttl).isoformat(),
+            }
+        )
+        await self._async_save()
+
+    async def async_replay(
+        self, execute: Callable[[str, dict[str, Any]], Awaitable[bool]]
+    ) -> int:
+        """Run queued commands in order. Returns the number the charger accepted.
+
+        A command the charger rejects or that fails validation is dropped; one
+        that hits a connectivity error (the link went away again) stays queued
+        together with everything after it.
+        """
+        now = dt_util.utcnow()
+        self._prune_expired(now)
+        replayed = 0
+        oldest: datetime | None = None
+        while self._commands:
+            command = self._commands[0]
+            try:
+                accepted = await execute(command["kind"], command["args"])
+            except CONNECTIVITY_ERRORS as err:
+                _LOGGER.warning("Replaying queued %s failed, keeping it queued: %s", command["kind"], err)
+                break
+            except Exception as err:
+                _LOGGER.error("Queued %s is invalid, dropping it: %s", command["kind"], err)
+                self._commands.pop(0)
+                continue
+            self._commands.pop(0)
+            if not accepted:
+                _LOGGER.warning("EVSE rejected queued %s, dropping it", command["kind"])
+                continue
+            replayed += 1
+            queued_at = dt_util.parse_datetime(command["queued_at"])
+            if oldest is None or queued_at < oldest:
+                oldest = queued_at
+        if oldest is not None:
+            self.last_replay = dt_util.utcnow()
+            self.last_replay_latency = (self.last_replay - oldest).total_seconds()
+        await self._async_save()
+        return replayed
@@ -9,11 +9,25 @@ import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST, CONF_PASSWORD
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
-
-from .const import DOMAIN
+from homeassistant.helpers import selector
+
+from .const import (
+    CONF_FLEET_MAX_ACTIVE,
+    CONF_FLEET_PRIORITY,
+    CONF_PRICE_ENTITY,
+    CONF_PROXY_ENABLED,
+    CONF_PROXY_HOST,
+    CONF_PROXY_PORT,
+    CONF_TARIFF_TABLE,
+    DEFAULT_PROXY_HOST,
+    DEFAULT_PROXY_PORT,
+    DOMAIN,
+)
+from .cost import parse_tariff_table
 from .evse_loader import evse_protocol
+from .proxy import APP_PORT as PROXY_APP_PORT
 
 # Import specific classes from the modules
 SimpleEVSEProtocol = evse_protocol.SimpleEVSEProtocol
@@ -88,6 +102,71 @@ class EVSEMasterConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
         )
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> EVSEMasterOptionsFlow:
+        """Get the options flow for this handler."""
+        return EVSEMasterOptionsFlow()
+
+
+class EVSEMasterOptionsFlow(config_entries.OptionsFlow):
+    """Handle EVSEMaster options."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.ConfigFlowResult:
+        """Manage the options."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            try:
+                if user_input.get(CONF_TARIFF_TABLE):
+                    parse_tariff_table(user_input[CONF_TARIFF_TABLE])
+            except ValueError:
+                errors[CONF_TARIFF_TABLE] = "invalid_tariff"
+            if user_input.get(CONF_PROXY_PORT) == PROXY_APP_PORT:
+                errors[CONF_PROXY_PORT] = "proxy_port_in_use"
+            if not errors:
+                return self.async_create_entry(data=user_input)
+
+        options = user_input or self.config_entry.options
+        schema = vol.Schema(
+            {
+                vol.Optional(
+                    CONF_PROXY_ENABLED,
+                    default=options.get(CONF_PROXY_ENABLED, False),
+                ): bool,
+                vol.Optional(
+                    CONF_PROXY_HOST,
+                    default=options.get(CONF_PROXY_HOST, DEFAULT_PROXY_HOST),
+                ): str,
+                vol.Optional(
+                    CONF_PROXY_PORT,
+                    default=options.get(CONF_PROXY_PORT, DEFAULT_PROXY_PORT),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=65535)),
+                vol.Optional(
+                    CONF_PRICE_ENTITY,
+                    description={"suggested_value": options.get(CONF_PRICE_ENTITY)},
+                ): selector.EntitySelector(
+                    selector.EntitySelectorConfig(domain=["sensor", "input_number", "number"])
+                ),
+                vol.Optional(
+                    CONF_TARIFF_TABLE,
+                    description={"suggested_value": options.get(CONF_TARIFF_TABLE)},
+                ): str,
+                vol.Optional(
+                    CONF_FLEET_MAX_ACTIVE,
+                    default=options.get(CONF_FLEET_MAX_ACTIVE, 0),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+                vol.Optional(
+                    CONF_FLEET_PRIORITY,
+                    default=options.get(CONF_FLEET_PRIORITY, 0),
+                ): vol.All(vol.Coerce(int), vol.Range(min=-100, max=100)),
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
+
 
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
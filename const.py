@@ -2,4 +2,23 @@ DOMAIN = "evsemaster"
 SERVICE_ACTION_START_CHARGING = "start_charging"
 SERVICE_DATA_DURATION_HOURS = "duration_hours"
 SERVICE_DATA_MAX_AMPS = "max_amps"
-SERVICE_DATA_START_DATETIME = "start_datetime"
\ No newline at end of file
+SERVICE_DATA_START_DATETIME = "start_datetime"
+SERVICE_ACTION_SESSION_ANALYTICS = "session_analytics"
+SERVICE_DATA_START_TIME = "start_time"
+SERVICE_DATA_END_TIME = "end_time"
+SERVICE_DATA_POWER_THRESHOLD = "power_threshold"
+SERVICE_DATA_DERATING_TEMPERATURE = "derating_temperature"
+SERVICE_DATA_VOLTAGE = "voltage"
+
+CONF_PROXY_ENABLED = "proxy_enabled"
+CONF_PROXY_HOST = "proxy_host"
+CONF_PROXY_PORT = "proxy_port"
+DEFAULT_PROXY_HOST = "0.0.0.0"
+# anything but 28376, where the protocol library itself listens
+DEFAULT_PROXY_PORT = 28377
+
+CONF_PRICE_ENTITY = "price_entity"
+CONF_TARIFF_TABLE = "tariff_table"
+
+CONF_FLEET_MAX_ACTIVE = "fleet_max_active"
+CONF_FLEET_PRIORITY = "fleet_priority"
@@ -4,15 +4,31 @@ from __future__ import annotations
 
 from datetime import timedelta,datetime
 import logging
-from typing import Any
+import time
+from typing import Any, Callable
 
-from homeassistant.config_entries import ConfigEntry
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
 from homeassistant.const import CONF_HOST, CONF_PASSWORD
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN
+from .command_queue import (
+    COMMAND_SET_MAX_AMPS,
+    COMMAND_SET_NICKNAME,
+    COMMAND_START_CHARGING,
+    COMMAND_STOP_CHARGING,
+    CONNECTIVITY_ERRORS,
+    EVSECommandQueue,
+)
+from .const import CONF_FLEET_MAX_ACTIVE, CONF_FLEET_PRIORITY, CONF_PRICE_ENTITY, CONF_PROXY_ENABLED, CONF_PROXY_HOST, CONF_PROXY_PORT, CONF_TARIFF_TABLE, DEFAULT_PROXY_HOST, DEFAULT_PROXY_PORT, DOMAIN
+from .cost import CostTracker, TimeOfUseTariff, parse_tariff_table
 from .evse_loader import evse_protocol, data_types
+from .prediction import ChargeRatePredictor
+from .proxy import APP_PORT as PROXY_APP_PORT, EVSESessionProxy
+from .session import ChargingSession
 
 # Import specific classes from the modules
 SimpleEVSEProtocol = evse_protocol.SimpleEVSEProtocol
@@ -20,6 +36,8 @@ EvseStatus = data_types.EvseStatus
 ChargingStatus = data_types.ChargingStatus
 BaseSchema = data_types.BaseSchema
 EvseDeviceInfo = data_types.EvseDeviceInfo
+CurrentStateEnum = data_types.CurrentStateEnum
+PlugStateEnum = data_types.PlugStateEnum
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -43,6 +61,20 @@ class DataSchema(BaseSchema):
     charging_status: ChargingStatus | None = None
     device: DeviceSchema = DeviceSchema()
 
+@callback
+def async_get_coordinator_for_device(
+    hass: HomeAssistant, device_id: str
+) -> EVSEMasterDataUpdateCoordinator | None:
+    """Return the coordinator of a loaded entry owning the device."""
+    device = dr.async_get(hass).async_get(device_id)
+    if device is None:
+        return None
+    for entry_id in device.config_entries:
+        entry = hass.config_entries.async_get_entry(entry_id)
+        if entry and entry.domain == DOMAIN and entry.state is ConfigEntryState.LOADED:
+            return entry.runtime_data
+    return None
+
 class EVSEMasterDataUpdateCoordinator(DataUpdateCoordinator):
 
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
@@ -56,15 +88,62 @@ class EVSEMasterDataUpdateCoordinator(DataUpdateCoordinator):
         self.entry = entry
         self.host = entry.data[CONF_HOST]
         self.password = entry.data[CONF_PASSWORD]
+        # in proxy mode the proxy owns the EVSE session and we log in through it
+        self.proxy: EVSESessionProxy | None = None
+        if entry.options.get(CONF_PROXY_ENABLED):
+            listen_port = entry.options.get(CONF_PROXY_PORT, DEFAULT_PROXY_PORT)
+            if listen_port == PROXY_APP_PORT:
+                _LOGGER.warning(
+                    "Proxy port %s is taken by the EVSE protocol, using %s", listen_port, DEFAULT_PROXY_PORT
+                )
+                listen_port = DEFAULT_PROXY_PORT
+            self.proxy = EVSESessionProxy(
+                charger_host=self.host,
+                password=self.password,
+                listen_host=entry.options.get(CONF_PROXY_HOST, DEFAULT_PROXY_HOST),
+                listen_port=listen_port,
+            )
+            self.host = self.proxy.local_host
         self._connected = False
         self.data: DataSchema = DataSchema()
         self.secondary_timer = datetime.utcnow()
+        # session prediction inputs, restored by the number/datetime entities
+        self.session = ChargingSession(hass, entry.entry_id)
+        self.predictor = ChargeRatePredictor()
+        self.energy_target_kwh: float | None = None
+        self.departure_time: datetime | None = None
+        self.command_queue = EVSECommandQueue(hass, entry.entry_id)
+        tariff = None
+        if entry.options.get(CONF_TARIFF_TABLE):
+            try:
+                tariff = TimeOfUseTariff(parse_tariff_table(entry.options[CONF_TARIFF_TABLE]))
+            except ValueError as err:
+                _LOGGER.error("Ignoring invalid tariff table: %s", err)
+        self.cost = CostTracker(
+            hass,
+            entry.entry_id,
+            self.session,
+            entry.options.get(CONF_PRICE_ENTITY) or None,
+            tariff,
+        )
+        self._device_info: dict[str, Any] | None = None
+        self._device_info_source: DeviceSchema | None = None
+        # fleet scheduling; scheduler is set when the charger joins the fleet
+        self.fleet_max_active: int = entry.options.get(CONF_FLEET_MAX_ACTIVE, 0)
+        self.fleet_priority: int = entry.options.get(CONF_FLEET_PRIORITY, 0)
+        self.scheduler: Any = None
+        # raw status stream listeners, bypassing the entity/state machine path,
+        # each with an optional callback for when the coordinator shuts down
+        self._status_listeners: dict[Callable[[EvseStatus], None], CALLBACK_TYPE | None] = {}
 
         self.proto = SimpleEVSEProtocol(
             host=self.host,
             password=self.password,
             event_callback=self._on_protocol_event,
         )
+        if self.proxy:
+            # the library sends to the EVSE port by default; talk to the proxy instead
+            self.proto.send_port = self.proxy.listen_port
 
     def _ensure_serial(self) -> tuple[str, DataSchema]:
         """Ensure the serial number is set in the data schema."""
@@ -78,7 +157,27 @@ class EVSEMasterDataUpdateCoordinator(DataUpdateCoordinator):
             self._ensure_serial()
             changed = False
             if event_type == EvseStatus.__name__ and isinstance(payload, EvseStatus):
+                previous = self.data.status
                 self.data.status = payload
+                plugged_in = payload.plug_state is not None and payload.plug_state != PlugStateEnum.DISCONNECTED
+                delta_kwh = self.session.async_update(
+                    payload.total_kwh, plugged_in, self.data.charging_status
+                )
+                self.predictor.update(
+                    time.monotonic(),
+                    payload.current_power,
+                    payload.current_state == CurrentStateEnum.CHARGING,
+                    self.session.started,
+                )
+                self.cost.async_update(delta_kwh)
+                for listener in tuple(self._status_listeners):
+                    listener(payload)
+                if self.scheduler is not None and (
+                    previous is None
+                    or previous.plug_state != payload.plug_state
+                    or previous.current_state != payload.current_state
+                ):
+                    self.scheduler.async_on_status(self)
                 changed = True
             elif event_type == ChargingStatus.__name__ and isinstance(payload, ChargingStatus):
                 self.data.charging_status = payload
@@ -94,6 +193,8 @@ class EVSEMasterDataUpdateCoordinator(DataUpdateCoordinator):
         """Ensure connection and login; return latest cached snapshot."""
         try:
             if not self._connected:
+                if self.proxy:
+                    await self.proxy.async_start()
                 ok = await self.proto.connect()
                 if not ok:
                     raise UpdateFailed("Failed to create sockets to connect to EVSE")
@@ -106,6 +207,11 @@ class EVSEMasterDataUpdateCoordinator(DataUpdateCoordinator):
                     raise UpdateFailed("Failed to login to EVSE")
                 _LOGGER.info("Logged in to EVSE")
 
+            if len(self.command_queue):
+                replayed = await self.command_queue.async_replay(self._async_execute)
+                if replayed:
+                    _LOGGER.info("Replayed %d queued command(s) on EVSE", replayed)
+
             # data is pushed via callback; just request an update
             await self.proto.request_status()
             # every x minutes request full device info to catch changes
@@ -122,12 +228,105 @@ class EVSEMasterDataUpdateCoordinator(DataUpdateCoordinator):
             _LOGGER.error("Error updating EVSE data: %s", err)
             raise UpdateFailed(f"Error communicating with EVSE: {err}") from err
 
+    @property
+    def device_info(self) -> dict[str, Any]:
+        """Device info shared by all entities, rebuilt only when the device changes."""
+        device = self.data.device
+        if self._device_info is None or self._device_info_source is not device:
+            self._device_info = device.get_attr_device_info()
+            self._device_info_source = device
+        return self._device_info
+
+    @callback
+    def async_subscribe_status(
+        self,
+        listener: Callable[[EvseStatus], None],
+        on_close: CALLBACK_TYPE | None = None,
+    ) -> CALLBACK_TYPE:
+        """Call listener with every pushed EvseStatus; returns an unsubscribe callback.
+
+        on_close is called if the coordinator shuts down (entry unload or reload)
+        while the listener is still subscribed.
+        """
+        self._status_listeners[listener] = on_close
+
+        @callback
+        def _unsubscribe() -> None:
+            self._status_listeners.pop(listener, None)
+
+        return _unsubscribe
+
+    def seconds_to_target(self) -> float | None:
+        """Predict seconds until the session reaches the energy target."""
+        energy = self.session.energy_kwh
+        if not self.energy_target_kwh or energy is None:
+            return None
+        return self.predictor.seconds_to_energy(self.energy_target_kwh - energy)
+
+    def energy_at_departure(self) -> float | None:
+        """Predict the session energy delivered by the departure time."""
+        energy = self.session.energy_kwh
+        if self.departure_time is None or energy is None:
+            return None
+        remaining = (self.departure_time - dt_util.utcnow()).total_seconds()
+        if remaining < 0:
+            return None
+        return energy + self.predictor.energy_within(remaining)
+
     async def async_shutdown(self) -> None:
+        # a reload builds a new coordinator, so end the streams fed by this one
+        listeners, self._status_listeners = self._status_listeners, {}
+        for on_close in listeners.values():
+            if on_close is not None:
+                on_close()
         await self.proto.disconnect()
+        if self.proxy:
+            await self.proxy.async_stop()
         self._connected = False
         _LOGGER.info("EVSE client disconnected")
 
 
+    @property
+    def is_online(self) -> bool:
+        """Whether commands can be sent to the EVSE right now."""
+        return self._connected and self.proto.is_logged_in
+
+    async def _async_execute(self, kind: str, args: dict[str, Any]) -> bool:
+        """Send one command to the EVSE; raises when the EVSE cannot be reached."""
+        if kind == COMMAND_START_CHARGING:
+            minutes = None
+            if args.get("duration_hours") is not None:
+                minutes = int(args["duration_hours"] * 60)
+            start_datetime = args.get("start_datetime")
+            if isinstance(start_datetime, str):
+                start_datetime = datetime.fromisoformat(start_datetime)
+            _LOGGER.info(
+                f"Starting charging on {self.data.device.serial_number}: amps={args.get('max_amps')}, duration={minutes}m, start={start_datetime}"
+            )
+            return await self.proto.start_charging(args.get("max_amps"), start_datetime, minutes)
+        if kind == COMMAND_STOP_CHARGING:
+            return await self.proto.stop_charging()
+        if kind == COMMAND_SET_NICKNAME:
+            return await self.proto.set_nickname(args["nickname"])
+        if kind == COMMAND_SET_MAX_AMPS:
+            return await self.proto.set_output_amperage(args["amperage"])
+        raise ValueError(f"Unknown EVSE command {kind}")
+
+    async def _async_command(self, kind: str, args: dict[str, Any]) -> bool:
+        """Run a command now, or queue it for replay when the EVSE is unreachable."""
+        if self.is_online:
+            try:
+                return await self._async_execute(kind, args)
+            except CONNECTIVITY_ERRORS as err:
+                _LOGGER.warning("Error running %s on %s: %s", kind, self.data.device.serial_number, err)
+            except ValueError as err:
+                # out-of-range input would fail the same way on replay
+                raise ServiceValidationError(str(err)) from err
+        _LOGGER.info("EVSE %s unreachable, queued %s for replay", self.data.device.serial_number, kind)
+        await self.command_queue.async_enqueue(kind, args)
+        self.async_update_listeners()
+        return True
+
     async def async_start_charging(
         self, 
         max_amps: int | None = None,
@@ -135,40 +334,24 @@ class EVSEMasterDataUpdateCoordinator(DataUpdateCoordinator):
         duration_hours: float | None = None,
     ) -> bool:
         """Start charging with advanced parameters."""
-        try:
-            minutes = None
-            if duration_hours is not None:
-                minutes = int(duration_hours * 60)
-            if isinstance(start_datetime, str):
-                start_datetime = datetime.fromisoformat(start_datetime)
-            _LOGGER.info(
-                f"Starting charging on {self.data.device.serial_number}: amps={max_amps}, duration={minutes}m, start={start_datetime}"
-            )
-            return await self.proto.start_charging(max_amps,start_datetime,minutes)
-        except Exception as err:
-            _LOGGER.error("Error starting charging on %s: %s", self.data.device.serial_number, err)
-            return False
-        
-    async def async_stop_charging(self) -> bool:
-        try:
-            return await self.proto.stop_charging()
-        except Exception as err:
-            _LOGGER.error("Error stopping charging on %s: %s", self.data.device.serial_number, err)
-            return False
+        if isinstance(start_datetime, datetime):
+            start_datetime = start_datetime.isoformat()
+        return await self._async_command(
+            COMMAND_START_CHARGING,
+            {
+                "max_amps": max_amps,
+                "start_datetime": start_datetime,
+                "duration_hours": duration_hours,
+            },
+        )
 
+    async def async_stop_charging(self) -> bool:
+        return await self._async_command(COMMAND_STOP_CHARGING, {})
 
     async def async_set_nickname(self, nickname: str) -> bool:
         """Set device nickname."""
-        try:
-            return await self.proto.set_nickname(nickname)
-        except Exception as err:
-            _LOGGER.error("Error setting nickname on %s: %s", self.data.device.serial_number, err)
-            return False
+        return await self._async_command(COMMAND_SET_NICKNAME, {"nickname": nickname})
 
     async def async_set_max_amps(self, amperage: int) -> bool:
         """Set maximum output amperage."""
-        try:
-            return await self.proto.set_output_amperage(amperage)
-        except Exception as err:
-            _LOGGER.error("Error setting max amperage on %s: %s", self.data.device.serial_number, err)
-            return False
+        return await self._async_command(COMMAND_SET_MAX_AMPS, {"amperage": amperage})
@@ -0,0 +1,267 @@
+"""Charging cost accounting for EVSEMaster chargers."""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections.abc import Callable
+from datetime import date, datetime
+import logging
+from typing import Any
+
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .session import ChargingSession
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+DATA_FLEET_COST = "fleet_cost"
+
+
+def parse_tariff_table(text: str) -> list[tuple[int, float]]:
+    """Parse "HH:MM=price, HH:MM=price" into (minute of day, price) sorted by time.
+
+    Each price applies from its time until the next entry, wrapping past midnight.
+    """
+    table: list[tuple[int, float]] = []
+    for item in text.replace("\n", ",").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        start, _, price = item.partition("=")
+        hours, _, minutes = start.strip().partition(":")
+        minute = int(hours) * 60 + int(minutes or 0)
+        if not 0 <= minute < 24 * 60:
+            raise ValueError(f"Invalid tariff start time {start!r}")
+        table.append((minute, float(price)))
+    if not table:
+        raise ValueError("Tariff table is empty")
+    return sorted(table)
+
+
+class TimeOfUseTariff:
+    """Price lookup from a time-of-use table in local time."""
+
+    def __init__(self, table: list[tuple[int, float]]) -> None:
+        self._starts = [minute for minute, _ in table]
+        self._prices = [price for _, price in table]
+
+    def price_at(self, moment: datetime) -> float:
+        local = dt_util.as_local(moment)
+        index = bisect_right(self._starts, local.hour * 60 + local.minute) - 1
+        # before the first entry the last one of the previous day still applies
+        return self._prices[index]
+
+
+class FleetCost:
+    """Running cost totals across all chargers, updated by each charger's deltas."""
+
+    def __init__(self) -> None:
+        self.total = 0.0
+        self.users: dict[str, float] = {}
+        self.day = dt_util.now().date()
+        self._day_cost = 0.0
+        self.owner_entry_id: str | None = None
+        self._hosts: dict[str, Callable[[], None]] = {}
+        self._listeners: list[Callable[[], None]] = []
+
+    @property
+    def today(self) -> float:
+        # the running total belongs to a past day until the next cost rolls it over
+        return self._day_cost if dt_util.now().date() == self.day else 0.0
+
+    def _roll_day(self, day: date) -> None:
+        if day > self.day:
+            self.day = day
+            self._day_cost = 0.0
+
+    @callback
+    def async_register(self, tracker: CostTracker) -> None:
+        """Add the persisted totals of a charger."""
+        self.total += tracker.total_cost
+        for user, cost in tracker.users.items():
+            self.users[user] = self.users.get(user, 0.0) + cost
+        self._roll_day(tracker.day)
+        if tracker.day == self.day:
+            self._day_cost += tracker.day_cost
+
+    @callback
+    def async_unregister(self, tracker: CostTracker) -> None:
+        self.total -= tracker.total_cost
+        for user, cost in tracker.users.items():
+            self.users[user] = self.users.get(user, 0.0) - cost
+        if tracker.day == self.day:
+            self._day_cost -= tracker.day_cost
+
+    @callback
+    def async_add(self, tracker: CostTracker, user: str, cost: float) -> None:
+        self.total += cost
+        self.users[user] = self.users.get(user, 0.0) + cost
+        self._roll_day(tracker.day)
+        self._day_cost += cost
+        for listener in tuple(self._listeners):
+            listener()
+
+    @callback
+    def async_add_host(self, entry_id: str, add_sensor: Callable[[], None]) -> Callable[[], None]:
+        """Offer a charger to host the fleet-wide sensor; one of them adds it at a time.
+
+        When the hosting charger is removed, the next one still offered takes over.
+        """
+        self._hosts[entry_id] = add_sensor
+        if self.owner_entry_id is None:
+            self._async_hand_over()
+
+        @callback
+        def _remove() -> None:
+            del self._hosts[entry_id]
+            if self.owner_entry_id == entry_id:
+                self.owner_entry_id = None
+                self._async_hand_over()
+
+        return _remove
+
+    @callback
+    def _async_hand_over(self) -> None:
+        for entry_id, add_sensor in self._hosts.items():
+            self.owner_entry_id = entry_id
+            add_sensor()
+            return
+
+    @callback
+    def async_add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        self._listeners.append(listener)
+
+        @callback
+        def _remove() -> None:
+            self._listeners.remove(listener)
+
+        return _remove
+
+
+@callback
+def async_get_fleet_cost(hass: HomeAssistant) -> FleetCost:
+    return hass.data.setdefault(DOMAIN, {}).setdefault(DATA_FLEET_COST, FleetCost())
+
+
+class CostTracker:
+    """Attribute each kWh delta of one charger's session to the tariff in force.
+
+    Totals per session, per local day and per user are kept incrementally and
+    persisted, so they survive restarts; the session (plug-in, counter resets,
+    user) is tracked by the shared ChargingSession.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        session: ChargingSession,
+        price_entity: str | None = None,
+        tariff: TimeOfUseTariff | None = None,
+    ) -> None:
+        self.hass = hass
+        self.entry_id = entry_id
+        self.session = session
+        self.price_entity = price_entity
+        self.tariff = tariff
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.cost"
+        )
+        self.fleet = async_get_fleet_cost(hass)
+        self.last_price: float | None = None
+        self.session_cost = 0.0
+        # the session the cost belongs to, by its start time
+        self.session_started: datetime | None = None
+        self.day = dt_util.now().date()
+        self.day_cost = 0.0
+        self.total_cost = 0.0
+        self.users: dict[str, float] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.price_entity is not None or self.tariff is not None
+
+    @property
+    def day_start(self) -> datetime:
+        return dt_util.start_of_local_day(self.day)
+
+    async def async_load(self) -> None:
+        """Restore totals from storage and join the fleet totals."""
+        data = await self._store.async_load()
+        if data:
+            self.last_price = data.get("last_price")
+            self.session_cost = data.get("session_cost", 0.0)
+            if started := data.get("session_started"):
+                self.session_started = dt_util.parse_datetime(started)
+            self.day = date.fromisoformat(data["day"]) if "day" in data else self.day
+            self.day_cost = data.get("day_cost", 0.0)
+            self.total_cost = data.get("total_cost", 0.0)
+            self.users = data.get("users", {})
+        self.fleet.async_register(self)
+
+    async def async_unload(self) -> None:
+        """Write pending totals now and leave the fleet totals."""
+        await self._store.async_save(self._data_to_save())
+        self.fleet.async_unregister(self)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "last_price": self.last_price,
+            "session_cost": self.session_cost,
+            "session_started": self.session_started.isoformat() if self.session_started else None,
+            "day": self.day.isoformat(),
+            "day_cost": self.day_cost,
+            "total_cost": self.total_cost,
+            "users": self.users,
+        }
+
+    def _price(self, now: datetime) -> float | None:
+        if self.price_entity is not None:
+            state = self.hass.states.get(self.price_entity)
+            if state is not None and state.state not in (STATE_UNKNOWN, STATE_UNAVAILABLE):
+                try:
+                    self.last_price = float(state.state)
+                except ValueError:
+                    pass
+            # keep billing at the last known price while the entity is unavailable
+            return self.last_price
+        if self.tariff is not None:
+            self.last_price = self.tariff.price_at(now)
+        return self.last_price
+
+    @callback
+    def async_update(self, delta_kwh: float) -> None:
+        """Bill the kWh the session delivered since the previous status sample."""
+        if not self.enabled:
+            return
+        now = dt_util.utcnow()
+        if self.session_started != self.session.started:
+            self.session_started = self.session.started
+            self.session_cost = 0.0
+
+        today = dt_util.as_local(now).date()
+        if today != self.day:
+            self.day = today
+            self.day_cost = 0.0
+
+        if delta_kwh <= 0:
+            return
+        price = self._price(now)
+        if price is None:
+            _LOGGER.warning("No price available, %.3f kWh left unbilled", delta_kwh)
+            return
+
+        cost = delta_kwh * price
+        user = self.session.user
+        self.session_cost += cost
+        self.day_cost += cost
+        self.total_cost += cost
+        self.users[user] = self.users.get(user, 0.0) + cost
+        self.fleet.async_add(self, user, cost)
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
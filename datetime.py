@@ -0,0 +1,57 @@
+"""Date/time input entities for EVSEMaster integration."""
+
+from __future__ import annotations
+
+from datetime import datetime
+import logging
+
+from homeassistant.components.datetime import DateTimeEntity, DateTimeEntityDescription
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.util import dt as dt_util
+
+from .coordinator import EVSEMasterDataUpdateCoordinator
+from .entity import EVSEMasterEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+DEPARTURE_TIME = DateTimeEntityDescription(
+    key="departure_time",
+    translation_key="departure_time",
+    icon="mdi:car-clock",
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up date/time input entities."""
+    coordinator: EVSEMasterDataUpdateCoordinator = entry.runtime_data
+
+    async_add_entities([EVSEDepartureDateTime(coordinator, DEPARTURE_TIME)])
+
+
+class EVSEDepartureDateTime(EVSEMasterEntity, DateTimeEntity, RestoreEntity):
+    """Planned departure time kept across restarts."""
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the departure time from before the restart."""
+        await super().async_added_to_hass()
+        last = await self.async_get_last_state()
+        if last and last.state not in (STATE_UNKNOWN, STATE_UNAVAILABLE):
+            self.coordinator.departure_time = dt_util.parse_datetime(last.state)
+            self._async_update_attrs()
+
+    @callback
+    def _async_update_attrs(self) -> None:
+        self._attr_native_value = self.coordinator.departure_time
+
+    async def async_set_value(self, value: datetime) -> None:
+        """Set the planned departure time."""
+        self.coordinator.departure_time = value
+        self.coordinator.async_update_listeners()
@@ -0,0 +1,148 @@
+"""Shared entity base and value accessors for EVSEMaster platforms."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from operator import attrgetter
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.entity import Entity, EntityDescription
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import EVSEMasterDataUpdateCoordinator, DataSchema
+
+ValueFn = Callable[[EVSEMasterDataUpdateCoordinator], Any]
+
+
+def status_value(field: str, convert: Callable[[Any], Any] | None = None) -> ValueFn:
+    """Build an accessor for an EvseStatus field, None until the field is reported."""
+    getter = attrgetter(field)
+
+    def _value(coordinator: EVSEMasterDataUpdateCoordinator) -> Any:
+        status = coordinator.data.status
+        if status is None:
+            return None
+        value = getter(status)
+        if value is None or convert is None:
+            return value
+        return convert(value)
+
+    return _value
+
+
+def charging_status_value(field: str, convert: Callable[[Any], Any] | None = None) -> ValueFn:
+    """Build an accessor for a ChargingStatus field, None until the field is reported."""
+    getter = attrgetter(field)
+
+    def _value(coordinator: EVSEMasterDataUpdateCoordinator) -> Any:
+        cstatus = coordinator.data.charging_status
+        if cstatus is None:
+            return None
+        value = getter(cstatus)
+        if value is None or convert is None:
+            return value
+        return convert(value)
+
+    return _value
+
+
+def status_reports(field: str, absent: Any) -> Callable[[DataSchema], bool]:
+    """Whether the first EvseStatus carries a real value for field.
+
+    Every EvseStatus field always parses, so a missing sensor or phase shows up
+    as a fixed marker value (-1.0 for an absent temperature probe, 0 on an
+    unused phase) rather than None.
+    """
+    getter = attrgetter(field)
+
+    def _exists(data: DataSchema) -> bool:
+        return data.status is not None and getter(data.status) != absent
+
+    return _exists
+
+
+def always(_data: DataSchema) -> bool:
+    return True
+
+
+@callback
+def async_add_reported_entities(
+    coordinator: EVSEMasterDataUpdateCoordinator,
+    descriptions: Iterable[Any],
+    build: Callable[[Any], Entity],
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Add an entity for every description whose exists_fn passes.
+
+    Descriptions that depend on the reported status wait for the first pushed
+    EvseStatus, so the entities created don't depend on whether it arrived
+    before platform setup.
+    """
+    pending = []
+    ready = []
+    for description in descriptions:
+        (ready if description.exists_fn is always else pending).append(description)
+    async_add_entities(build(description) for description in ready)
+    if not pending:
+        return
+
+    @callback
+    def _add_pending() -> None:
+        async_add_entities(
+            build(description)
+            for description in pending
+            if description.exists_fn(coordinator.data)
+        )
+
+    if coordinator.data.status is not None:
+        _add_pending()
+        return
+
+    unsubscribe: list[CALLBACK_TYPE] = []
+
+    @callback
+    def _on_update() -> None:
+        if coordinator.data.status is None or not unsubscribe:
+            return
+        unsubscribe.pop()()
+        _add_pending()
+
+    @callback
+    def _on_unload() -> None:
+        if unsubscribe:
+            unsubscribe.pop()()
+
+    unsubscribe.append(coordinator.async_add_listener(_on_update))
+    coordinator.config_entry.async_on_unload(_on_unload)
+
+
+class EVSEMasterEntity(CoordinatorEntity[EVSEMasterDataUpdateCoordinator]):
+    """Base entity driven by an entity description.
+
+    State is computed once per coordinator update in _async_update_attrs, so the
+    state properties themselves are plain attribute reads.
+    """
+
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: EVSEMasterDataUpdateCoordinator,
+        description: EntityDescription,
+    ) -> None:
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{coordinator.data.device.serial_number}_{description.key}"
+        self._attr_device_info = coordinator.device_info
+        self._async_update_attrs()
+
+    @callback
+    def _async_update_attrs(self) -> None:
+        """Refresh cached state from the coordinator data."""
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._async_update_attrs()
+        super()._handle_coordinator_update()
@@ -2,23 +2,72 @@
 
 from __future__ import annotations
 
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
 import logging
+from typing import Any
 
-from homeassistant.components.number import NumberEntity
+from homeassistant.components.number import NumberEntity, NumberEntityDescription, RestoreNumber
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import UnitOfElectricCurrent, UnitOfEnergy
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .coordinator import EVSEMasterDataUpdateCoordinator, DataSchema
-from .evse_loader import data_types
-
-# Import specific classes from the modules
-EvseStatus = data_types.EvseStatus
+from .entity import EVSEMasterEntity, always
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True, kw_only=True)
+class EVSEMasterNumberEntityDescription(NumberEntityDescription):
+    """Describes an EVSEMaster number input."""
+
+    value_fn: Callable[[EVSEMasterDataUpdateCoordinator], float | None]
+    set_value_fn: Callable[[EVSEMasterDataUpdateCoordinator, float], Awaitable[Any]]
+    available_fn: Callable[[EVSEMasterDataUpdateCoordinator], bool] = lambda _: True
+    max_value_fn: Callable[[DataSchema], float] | None = None
+    exists_fn: Callable[[DataSchema], bool] = always
+
+
+async def _set_energy_target(coordinator: EVSEMasterDataUpdateCoordinator, value: float) -> None:
+    coordinator.energy_target_kwh = value or None
+    coordinator.async_update_listeners()
+
+
+MAX_AMPS = EVSEMasterNumberEntityDescription(
+    key="configured_max_amps",
+    translation_key="max_amps",
+    icon="mdi:flash",
+    native_min_value=6,
+    native_step=1,
+    native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
+    value_fn=lambda coordinator: (
+        float(amps) if (amps := coordinator.data.device.configured_max_amps) is not None else None
+    ),
+    set_value_fn=lambda coordinator, value: coordinator.async_set_max_amps(int(value)),
+    available_fn=lambda coordinator: (
+        coordinator.data.status is not None
+        and coordinator.data.device.configured_max_amps is not None
+    ),
+    max_value_fn=lambda data: data.device.max_amps,
+    exists_fn=lambda data: data.device.max_amps is not None,
+)
+
+ENERGY_TARGET = EVSEMasterNumberEntityDescription(
+    key="energy_target",
+    translation_key="energy_target",
+    icon="mdi:battery-charging-high",
+    native_min_value=0,
+    native_max_value=200,
+    native_step=0.5,
+    native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+    # 0 means no target
+    value_fn=lambda coordinator: coordinator.energy_target_kwh or 0.0,
+    set_value_fn=_set_energy_target,
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -28,51 +77,48 @@ async def async_setup_entry(
     coordinator: EVSEMasterDataUpdateCoordinator = entry.runtime_data
 
     entities: list[NumberEntity] = []
-    entities.append(EVSEMaxAmpsNumber(coordinator))
+    if MAX_AMPS.exists_fn(coordinator.data):
+        entities.append(EVSEMasterNumber(coordinator, MAX_AMPS))
+    entities.append(EVSEEnergyTargetNumber(coordinator, ENERGY_TARGET))
 
     async_add_entities(entities)
 
 
-class _BaseNumber(CoordinatorEntity[EVSEMasterDataUpdateCoordinator]):
-    _attr_has_entity_name = True
-
-    def __init__(self, coordinator: EVSEMasterDataUpdateCoordinator) -> None:
-        super().__init__(coordinator)
-        self._attr_device_info = coordinator.data.device.get_attr_device_info()
-
-    @property
-    def entry(self) -> DataSchema:
-        return self.coordinator.data
+class EVSEMasterNumber(EVSEMasterEntity, NumberEntity):
+    """Number input backed by accessors from its description."""
 
+    entity_description: EVSEMasterNumberEntityDescription
 
-class EVSEMaxAmpsNumber(_BaseNumber, NumberEntity):
-    _attr_translation_key = "max_amps"
-    _attr_icon = "mdi:flash"
-    _attr_native_min_value = 6
-    _attr_native_step = 1
-    _attr_native_unit_of_measurement = "A"
+    def __init__(
+        self,
+        coordinator: EVSEMasterDataUpdateCoordinator,
+        description: EVSEMasterNumberEntityDescription,
+    ) -> None:
+        super().__init__(coordinator, description)
+        if description.max_value_fn is not None:
+            self._attr_native_max_value = description.max_value_fn(coordinator.data)
 
-    def __init__(self, coordinator: EVSEMasterDataUpdateCoordinator) -> None:
-        super().__init__(coordinator)
-        serial = self.entry.device.serial_number
-        self._attr_native_max_value = self.entry.device.max_amps
-        self._attr_unique_id = f"{serial}_configured_max_amps"
-
-    @property
-    def native_value(self) -> float | None:
-        """Get current max amps setting."""
-        if self.entry.device:
-            return float(self.entry.device.configured_max_amps)
-        return None
+    @callback
+    def _async_update_attrs(self) -> None:
+        self._attr_native_value = self.entity_description.value_fn(self.coordinator)
+        self._data_available = self.entity_description.available_fn(self.coordinator)
 
     @property
     def available(self) -> bool:
         """Check if entity is available."""
-        status: EvseStatus | None = self.entry.status
-        if status and self.entry.device and self.entry.device.configured_max_amps is not None:
-            return True
-        return False
+        return self._data_available
 
     async def async_set_native_value(self, value: float) -> None:
-        """Set the max amps."""
-        await self.coordinator.async_set_max_amps(int(value))
\ No newline at end of file
+        await self.entity_description.set_value_fn(self.coordinator, value)
+
+
+class EVSEEnergyTargetNumber(EVSEMasterNumber, RestoreNumber):
+    """Session energy target kept across restarts."""
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the target from before the restart."""
+        await super().async_added_to_hass()
+        last = await self.async_get_last_number_data()
+        if last and last.native_value is not None:
+            self.coordinator.energy_target_kwh = last.native_value or None
+            self._async_update_attrs()
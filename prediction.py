@@ -0,0 +1,113 @@
+"""Online charge rate prediction for EVSEMaster sessions."""
+
+from __future__ import annotations
+
+from datetime import datetime
+import math
+
+
+class ChargeRatePredictor:
+    """Exponentially weighted online linear regression of power over time.
+
+    Only running sums are kept, re-centred on the newest sample, so memory and
+    work per update are constant. The fitted slope captures the power taper near
+    the end of a charge; a rising slope (ramp-up) is not extrapolated.
+    """
+
+    def __init__(self, time_constant: float = 600.0) -> None:
+        self.time_constant = time_constant
+        self.charging = False
+        self._session: datetime | None = None
+        self._last_time: float | None = None
+        self._clear_fit()
+
+    def _clear_fit(self) -> None:
+        # weighted sums with t measured relative to the newest sample
+        self._sw = 0.0
+        self._st = 0.0
+        self._stt = 0.0
+        self._sp = 0.0
+        self._stp = 0.0
+
+    def update(
+        self,
+        timestamp: float,
+        power_w: float | None,
+        charging: bool,
+        session: datetime | None,
+    ) -> None:
+        """Feed one pushed status sample (timestamp in seconds).
+
+        `session` identifies the charging session (its start time). The fit runs
+        over the whole session, so pauses in between (taper to completed, fleet
+        rotation, manual stop/start) keep it.
+        """
+        if session != self._session:
+            # new session: forget the previous fit
+            self._session = session
+            self._clear_fit()
+            self._last_time = None
+        self.charging = charging
+
+        if not charging or power_w is None:
+            return
+
+        if self._last_time is not None:
+            shift = timestamp - self._last_time
+            if shift < 0:
+                return
+            # move the origin to the new sample, then decay older samples
+            self._stt -= 2 * shift * self._st - shift * shift * self._sw
+            self._st -= shift * self._sw
+            self._stp -= shift * self._sp
+            decay = math.exp(-shift / self.time_constant)
+            self._sw *= decay
+            self._st *= decay
+            self._stt *= decay
+            self._sp *= decay
+            self._stp *= decay
+        self._last_time = timestamp
+        self._sw += 1.0
+        self._sp += power_w
+
+    def fit(self) -> tuple[float, float] | None:
+        """Return (power now in W, slope in W/s), or None without samples."""
+        if self._sw <= 0:
+            return None
+        mean_t = self._st / self._sw
+        mean_p = self._sp / self._sw
+        var_t = self._stt / self._sw - mean_t * mean_t
+        slope = 0.0
+        if var_t > 1e-6:
+            slope = (self._stp / self._sw - mean_t * mean_p) / var_t
+        power = max(mean_p - slope * mean_t, 0.0)
+        return power, min(slope, 0.0)
+
+    def seconds_to_energy(self, energy_kwh: float) -> float | None:
+        """Predict seconds until another energy_kwh is delivered, None if unreachable."""
+        if energy_kwh <= 0:
+            return 0.0
+        fitted = self.fit()
+        if not self.charging or fitted is None:
+            return None
+        power, slope = fitted
+        if power <= 0:
+            return None
+        energy_j = energy_kwh * 3.6e6
+        # solve power * t + slope * t^2 / 2 = energy (cancellation-free form)
+        disc = power * power + 2 * slope * energy_j
+        if disc < 0:
+            # power tapers to zero before the energy is delivered
+            return None
+        return 2 * energy_j / (power + math.sqrt(disc))
+
+    def energy_within(self, seconds: float) -> float:
+        """Predict kWh delivered over the next seconds."""
+        fitted = self.fit()
+        if not self.charging or fitted is None or seconds <= 0:
+            return 0.0
+        power, slope = fitted
+        if slope < 0:
+            # stop integrating once the taper reaches zero
+            seconds = min(seconds, -power / slope)
+        return (power * seconds + slope * seconds * seconds / 2) / 3.6e6
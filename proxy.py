@@ -0,0 +1,330 @@
+"""Local UDP session proxy sharing one EVSE login between local clients."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+import logging
+import time
+
+from .evse_loader import data_types
+
+# Import specific classes from the modules
+CommandEnum = data_types.CommandEnum
+
+_LOGGER = logging.getLogger(__name__)
+
+# the protocol library always listens here, so the proxy must not
+APP_PORT = 28376
+# where the EVSE listens until a datagram from it tells us otherwise
+EVSE_PORT = 7248
+
+# Datagram framing as reverse-engineered by emproto:
+# header(2) length(2) key_type(1) serial(8) password(6) command(2) payload checksum(2) tail(2)
+HEADER = CommandEnum.HEADER.to_bytes(2, "big")
+TAIL = CommandEnum.TAIL.to_bytes(2, "big")
+MIN_LENGTH = 25
+
+# unsolicited EVSE pushes and the response the session has to send exactly once
+PUSH_ACKS: dict[int, int] = {
+    CommandEnum.HEADING_EVENT: CommandEnum.HEADING_RESPONSE,
+    CommandEnum.CURRENT_STATUS_EVENT: CommandEnum.CURRENT_STATUS_RESPONSE,
+    CommandEnum.CURRENT_CHARGING_STATUS_EVENT: CommandEnum.CURRENT_CHARGING_STATUS_RESPONSE,
+}
+ACK_PUSHES: dict[int, int] = {ack: push for push, ack in PUSH_ACKS.items()}
+# cached pushes replayed to a client joining an established session
+REPLAY_COMMANDS = (
+    CommandEnum.CURRENT_STATUS_EVENT,
+    CommandEnum.CURRENT_CHARGING_STATUS_EVENT,
+)
+# requests are answered by the same id without the high bit, except these
+REQUEST_BIT = 0x8000
+REPLIES: dict[int, int] = {
+    CommandEnum.CURRENT_CHARGE_RECORD_REQUEST: CommandEnum.CURRENT_CHARGE_RECORD_EVENT,
+}
+# requests that read a setting when their first payload byte is GET_ACTION
+GETTERS = (CommandEnum.NICKNAME_REQUEST, CommandEnum.OUTPUT_AMPERAGE_REQUEST)
+GET_ACTION = bytes((CommandEnum.GET_ACTION,))
+
+CLIENT_TIMEOUT = 60.0
+SESSION_TIMEOUT = 30.0
+REPLY_TIMEOUT = 3.0
+# how long a getter reply answers further reads without asking the EVSE
+ANSWER_TIMEOUT = 300.0
+MAX_QUEUED_COMMANDS = 32
+
+
+@dataclass(slots=True)
+class Datagram:
+    """A decoded EVSEMaster datagram."""
+
+    key_type: int
+    serial: bytes
+    password: bytes
+    command: int
+    payload: bytes
+
+
+def _checksum(data: bytes) -> int:
+    return sum(data) % 0xFFFF
+
+
+def encode_datagram(datagram: Datagram) -> bytes:
+    """Frame a datagram for the wire."""
+    length = MIN_LENGTH + len(datagram.payload)
+    body = (
+        HEADER
+        + length.to_bytes(2, "big")
+        + bytes((datagram.key_type,))
+        + datagram.serial.ljust(8, b"\x00")[:8]
+        + datagram.password.ljust(6, b"\x00")[:6]
+        + datagram.command.to_bytes(2, "big")
+        + datagram.payload
+    )
+    return body + _checksum(body).to_bytes(2, "big") + TAIL
+
+
+def decode_datagram(data: bytes) -> Datagram | None:
+    """Parse a datagram, returning None when the framing is invalid."""
+    if len(data) < MIN_LENGTH or data[:2] != HEADER or data[-2:] != TAIL:
+        return None
+    if int.from_bytes(data[2:4], "big") != len(data):
+        return None
+    if int.from_bytes(data[-4:-2], "big") != _checksum(data[:-4]):
+        return None
+    return Datagram(
+        key_type=data[4],
+        serial=data[5:13],
+        password=data[13:19],
+        command=int.from_bytes(data[19:21], "big"),
+        payload=data[21:-4],
+    )
+
+
+class _Endpoint(asyncio.DatagramProtocol):
+    def __init__(self, on_datagram: Callable[[bytes, tuple[str, int]], None]) -> None:
+        self._on_datagram = on_datagram
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        self._on_datagram(data, addr)
+
+
+class EVSESessionProxy:
+    """Hold the single upstream EVSE session and multiplex local clients onto it.
+
+    Pushes from the EVSE are cached and fanned out to every client. Clients that
+    join while the session is up get the login handshake and latest status from
+    the cache instead of logging in again, and their status polls and setting
+    reads are answered from it too. Everything else clients send goes upstream
+    one command at a time, in arrival order.
+    """
+
+    def __init__(
+        self,
+        charger_host: str,
+        password: str,
+        listen_host: str,
+        listen_port: int,
+        charger_port: int = EVSE_PORT,
+    ) -> None:
+        if listen_port == APP_PORT:
+            raise ValueError(f"The session proxy cannot listen on {APP_PORT}, the protocol library uses it")
+        self.charger_host = charger_host
+        self.charger_port = charger_port
+        self.listen_host = listen_host
+        self.listen_port = listen_port
+        self._password = password.encode().ljust(6, b"\x00")[:6]
+        self._downstream: asyncio.DatagramTransport | None = None
+        self._upstream: asyncio.DatagramTransport | None = None
+        self._worker: asyncio.Task | None = None
+        self._commands: asyncio.Queue[tuple[bytes, int, bool]] = asyncio.Queue(MAX_QUEUED_COMMANDS)
+        self._clients: dict[tuple[str, int], float] = {}
+        self._cache: dict[int, bytes] = {}
+        # getter request -> (time, EVSE reply to the last read)
+        self._answers: dict[int, tuple[float, bytes]] = {}
+        # getter request -> sets of it queued but not yet answered by the EVSE
+        self._pending_sets: dict[int, int] = {}
+        self._unacked: set[int] = set()
+        self._last_push: float | None = None
+        self._reply: asyncio.Future[bytes] | None = None
+        self._reply_command: int | None = None
+
+    @property
+    def local_host(self) -> str:
+        """Address local clients (and the integration itself) should connect to."""
+        if self.listen_host in ("", "0.0.0.0"):
+            return "127.0.0.1"
+        return self.listen_host
+
+    @property
+    def is_running(self) -> bool:
+        return self._downstream is not None
+
+    @property
+    def session_alive(self) -> bool:
+        """Whether the upstream session is logged in and still pushing."""
+        return (
+            self._last_push is not None
+            and time.monotonic() - self._last_push < SESSION_TIMEOUT
+            and CommandEnum.LOGIN_SUCCESS_EVENT in self._cache
+        )
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    async def async_start(self) -> None:
+        """Bind the local and upstream sockets."""
+        if self.is_running:
+            return
+        loop = asyncio.get_running_loop()
+        self._upstream, _ = await loop.create_datagram_endpoint(
+            lambda: _Endpoint(self._on_upstream),
+            local_addr=("0.0.0.0", 0),
+        )
+        try:
+            self._downstream, _ = await loop.create_datagram_endpoint(
+                lambda: _Endpoint(self._on_downstream),
+                local_addr=(self.listen_host, self.listen_port),
+            )
+        except OSError:
+            self._upstream.close()
+            self._upstream = None
+            raise
+        # resolve an ephemeral listen port
+        self.listen_port = self._downstream.get_extra_info("sockname")[1]
+        self._worker = loop.create_task(self._run_commands())
+        _LOGGER.info(
+            "EVSE session proxy listening on %s:%s for %s",
+            self.listen_host,
+            self.listen_port,
+            self.charger_host,
+        )
+
+    async def async_stop(self) -> None:
+        """Close both sockets and drop queued commands."""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        for transport in (self._downstream, self._upstream):
+            if transport is not None:
+                transport.close()
+        self._downstream = self._upstream = None
+        self._commands = asyncio.Queue(MAX_QUEUED_COMMANDS)
+        self._clients.clear()
+        self._cache.clear()
+        self._answers.clear()
+        self._pending_sets.clear()
+        self._unacked.clear()
+        self._last_push = None
+
+    def _send_upstream(self, data: bytes) -> None:
+        if self._upstream is not None:
+            self._upstream.sendto(data, (self.charger_host, self.charger_port))
+
+    def _send_client(self, data: bytes, addr: tuple[str, int]) -> None:
+        if self._downstream is not None:
+            self._downstream.sendto(data, addr)
+
+    def _on_upstream(self, data: bytes, addr: tuple[str, int]) -> None:
+        # follow the EVSE to the port it actually talks from, like the library does
+        if addr[0] == self.charger_host and addr[1] != self.charger_port:
+            _LOGGER.debug("EVSE port changed from %s to %s", self.charger_port, addr[1])
+            self.charger_port = addr[1]
+        datagram = decode_datagram(data)
+        if datagram is None:
+            return
+        command = datagram.command
+        now = time.monotonic()
+        if command != CommandEnum.NOT_LOGGED_IN_EVENT:
+            self._cache[command] = data
+        if command in PUSH_ACKS:
+            # the EVSE only pushes to a logged-in session
+            self._last_push = now
+            self._unacked.add(command)
+        if self._reply is not None and command == self._reply_command and not self._reply.done():
+            self._reply.set_result(data)
+
+        for client, last_seen in list(self._clients.items()):
+            if now - last_seen > CLIENT_TIMEOUT:
+                del self._clients[client]
+            else:
+                self._send_client(data, client)
+
+    def _on_downstream(self, data: bytes, addr: tuple[str, int]) -> None:
+        datagram = decode_datagram(data)
+        if datagram is None:
+            return
+        if datagram.password != self._password:
+            _LOGGER.debug("Ignoring datagram with wrong password from %s", addr)
+            return
+        self._clients[addr] = time.monotonic()
+        command = datagram.command
+
+        if command == CommandEnum.LOGIN_REQUEST and self.session_alive:
+            self._send_client(self._cache[CommandEnum.LOGIN_SUCCESS_EVENT], addr)
+            return
+        if command == CommandEnum.LOGIN_CONFIRM_RESPONSE and self.session_alive:
+            for cached in REPLAY_COMMANDS:
+                if cached in self._cache:
+                    self._send_client(self._cache[cached], addr)
+            return
+        if command in ACK_PUSHES:
+            # the first client to acknowledge a push answers for the session
+            push = ACK_PUSHES[command]
+            if push in self._unacked:
+                self._unacked.discard(push)
+                self._send_upstream(data)
+            return
+
+        read = command in GETTERS and datagram.payload[:1] == GET_ACTION
+        if self.session_alive:
+            answer = self._cached_answer(command, read)
+            if answer is not None:
+                self._send_client(answer, addr)
+                return
+        try:
+            self._commands.put_nowait((data, command, read))
+        except asyncio.QueueFull:
+            _LOGGER.warning("EVSE proxy command queue full, dropping command %#06x", command)
+            return
+        if command in GETTERS and not read:
+            # a set changes the value; reads go upstream behind it until it is done
+            self._answers.pop(command, None)
+            self._pending_sets[command] = self._pending_sets.get(command, 0) + 1
+
+    def _cached_answer(self, command: int, read: bool) -> bytes | None:
+        """Answer a read from the cache, or None when it has to go to the EVSE."""
+        if command == CommandEnum.CURRENT_STATUS_EVENT:
+            # a status poll; a live session is pushed fresh status anyway
+            return self._cache.get(CommandEnum.CURRENT_STATUS_EVENT)
+        if not read or self._pending_sets.get(command):
+            return None
+        answered = self._answers.get(command)
+        if answered is not None and time.monotonic() - answered[0] < ANSWER_TIMEOUT:
+            return answered[1]
+        return None
+
+    async def _run_commands(self) -> None:
+        """Forward client commands upstream in order, one reply at a time."""
+        loop = asyncio.get_running_loop()
+        while True:
+            data, command, read = await self._commands.get()
+            if command == CommandEnum.LOGIN_CONFIRM_RESPONSE:
+                self._send_upstream(data)
+                continue
+            self._reply_command = REPLIES.get(command, command & ~REQUEST_BIT)
+            self._reply = loop.create_future()
+            self._send_upstream(data)
+            try:
+                reply = await asyncio.wait_for(self._reply, REPLY_TIMEOUT)
+                if read and not self._pending_sets.get(command):
+                    self._answers[command] = (time.monotonic(), reply)
+            except TimeoutError:
+                _LOGGER.debug("No EVSE reply to proxied command %#06x", command)
+            finally:
+                self._reply = None
+                self._reply_command = None
+                if command in GETTERS and not read:
+                    self._pending_sets[command] -= 1
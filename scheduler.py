@@ -0,0 +1,284 @@
+"""Fleet charging scheduler keeping a cap on concurrently charging EVSEs."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import heapq
+import logging
+import math
+import time
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import DOMAIN
+from .evse_loader import data_types
+
+# Import specific classes from the modules
+CurrentStateEnum = data_types.CurrentStateEnum
+PlugStateEnum = data_types.PlugStateEnum
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_SCHEDULER = "scheduler"
+ROTATION_INTERVAL = timedelta(minutes=30)
+ROTATION_CHECK_INTERVAL = timedelta(minutes=1)
+# a start not reported as CHARGING by then is sent again, up to MAX_START_ATTEMPTS
+START_TIMEOUT = timedelta(minutes=2)
+MAX_START_ATTEMPTS = 3
+
+
+@dataclass(slots=True)
+class _Vehicle:
+    """Scheduling state of the vehicle on one charger."""
+
+    charger: Any
+    plugged_in: bool = False
+    arrival: float = 0.0
+    active_since: float | None = None
+    commanded: bool | None = None
+    commanded_at: float | None = None
+    # the charger reported CHARGING since the last start command
+    confirmed: bool = False
+    start_attempts: int = 0
+    # stays set until unplugged: stopping a full car changes its reported state
+    full: bool = False
+    # gave up its slot (start never took, or stopped outside the scheduler)
+    released: bool = False
+
+
+class FleetChargingScheduler:
+    """Keep at most max_active chargers charging, chosen from plugged-in vehicles.
+
+    Vehicles are ranked by manual priority, then departure deadline, then
+    arrival. Vehicles that have charged for a full rotation interval while others
+    wait go to the back of the queue among vehicles with the same priority and
+    departure time, so those take turns; an earlier departure keeps its slot.
+
+    Selected vehicles are checked against the state the charger reports. A start
+    that doesn't show up as CHARGING is retried, then its slot goes to the next
+    vehicle. A vehicle stopped outside the scheduler also gives up its slot. Both
+    stay out of the rotation until they are seen charging again or unplugged.
+
+    Chargers are coordinator-like objects exposing config_entry, data.status,
+    departure_time, fleet_priority, fleet_max_active, async_start_charging() and
+    async_stop_charging().
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        rotation_interval: timedelta = ROTATION_INTERVAL,
+    ) -> None:
+        self.hass = hass
+        self.rotation_interval = rotation_interval.total_seconds()
+        self._vehicles: dict[str, _Vehicle] = {}
+        self._running = False
+        self._rerun = False
+        self.start_timeout = START_TIMEOUT.total_seconds()
+        self._unsub_rotation: CALLBACK_TYPE | None = None
+
+    @property
+    def max_active(self) -> int:
+        """The most restrictive cap configured on any member charger."""
+        caps = [v.charger.fleet_max_active for v in self._vehicles.values()]
+        return min(caps) if caps else 0
+
+    @callback
+    def async_register(self, charger: Any) -> None:
+        entry_id = charger.config_entry.entry_id
+        self._vehicles[entry_id] = _Vehicle(charger)
+        charger.scheduler = self
+        if self._unsub_rotation is None:
+            self._unsub_rotation = async_track_time_interval(
+                self.hass, self._async_check, ROTATION_CHECK_INTERVAL
+            )
+        self.async_on_status(charger)
+
+    @callback
+    def async_unregister(self, charger: Any) -> None:
+        self._vehicles.pop(charger.config_entry.entry_id, None)
+        charger.scheduler = None
+        if not self._vehicles and self._unsub_rotation is not None:
+            self._unsub_rotation()
+            self._unsub_rotation = None
+        self._async_schedule_rebalance()
+
+    @callback
+    def async_on_status(self, charger: Any) -> None:
+        """React to a plug_state/current_state push of a member charger."""
+        vehicle = self._vehicles.get(charger.config_entry.entry_id)
+        if vehicle is None:
+            return
+        status = charger.data.status
+        plugged_in = (
+            status is not None
+            and status.plug_state is not None
+            and status.plug_state != PlugStateEnum.DISCONNECTED
+        )
+        if plugged_in and not vehicle.plugged_in:
+            vehicle.arrival = time.monotonic()
+        if not plugged_in:
+            self._release(vehicle)
+            vehicle.full = False
+            vehicle.released = False
+        elif status.current_state == CurrentStateEnum.COMPLETED_FULL_CHARGE:
+            vehicle.full = True
+        elif status.current_state == CurrentStateEnum.CHARGING:
+            vehicle.released = False
+            if vehicle.commanded:
+                vehicle.confirmed = True
+                vehicle.start_attempts = 0
+        elif vehicle.commanded and vehicle.confirmed:
+            # stopped behind our back (stop button, EVSE or car): free the slot
+            _LOGGER.debug("Fleet scheduler releasing %s, stopped outside the scheduler", vehicle.charger.config_entry.entry_id)
+            self._release(vehicle)
+            vehicle.released = True
+        vehicle.plugged_in = plugged_in
+        self._async_schedule_rebalance()
+
+    @staticmethod
+    def _release(vehicle: _Vehicle) -> None:
+        vehicle.active_since = None
+        vehicle.commanded = None
+        vehicle.commanded_at = None
+        vehicle.confirmed = False
+        vehicle.start_attempts = 0
+
+    def _wants_power(self, vehicle: _Vehicle) -> bool:
+        return (
+            vehicle.plugged_in
+            and not vehicle.full
+            and not vehicle.released
+            and vehicle.charger.data.status.current_state != CurrentStateEnum.EVSE_FAULT
+        )
+
+    @staticmethod
+    def _rank(vehicle: _Vehicle) -> tuple[float, float, float]:
+        deadline: datetime | None = vehicle.charger.departure_time
+        return (
+            -vehicle.charger.fleet_priority,
+            deadline.timestamp() if deadline is not None else math.inf,
+            vehicle.arrival,
+        )
+
+    @callback
+    def _async_schedule_rebalance(self) -> None:
+        # coalesce bursts of pushes into one pass at a time
+        if self._running:
+            self._rerun = True
+            return
+        self._running = True
+        self.hass.async_create_task(self._async_rebalance(), eager_start=True)
+
+    async def _async_rebalance(self) -> None:
+        try:
+            while True:
+                self._rerun = False
+                await self._async_apply(self._select())
+                if not self._rerun:
+                    break
+        finally:
+            self._running = False
+
+    def _select(self) -> set[str]:
+        """Entry ids of the vehicles that should be charging."""
+        candidates = [
+            (entry_id, vehicle)
+            for entry_id, vehicle in self._vehicles.items()
+            if self._wants_power(vehicle)
+        ]
+        chosen = heapq.nsmallest(self.max_active, candidates, key=lambda item: self._rank(item[1]))
+        return {entry_id for entry_id, _ in chosen}
+
+    async def _async_apply(self, selected: set[str]) -> None:
+        # stop first so the cap holds while chargers switch over
+        for entry_id, vehicle in list(self._vehicles.items()):
+            charging = vehicle.charger.data.status is not None and (
+                vehicle.charger.data.status.current_state == CurrentStateEnum.CHARGING
+            )
+            # also pause chargers started outside the scheduler
+            if entry_id not in selected and (vehicle.commanded or charging):
+                _LOGGER.debug("Fleet scheduler pausing %s", entry_id)
+                self._release(vehicle)
+                vehicle.commanded = False
+                await vehicle.charger.async_stop_charging()
+        for entry_id in selected:
+            vehicle = self._vehicles.get(entry_id)
+            if vehicle is None or vehicle.commanded:
+                continue
+            now = time.monotonic()
+            vehicle.commanded = True
+            vehicle.commanded_at = now
+            if vehicle.active_since is None:
+                vehicle.active_since = now
+            if vehicle.charger.data.status.current_state == CurrentStateEnum.CHARGING:
+                # already charging, started outside the scheduler: adopt it
+                vehicle.confirmed = True
+                continue
+            _LOGGER.debug("Fleet scheduler starting %s", entry_id)
+            vehicle.start_attempts += 1
+            await vehicle.charger.async_start_charging()
+
+    @callback
+    def _async_check(self, _now: Any = None) -> None:
+        """Periodic pass: reconcile starts with reported states, then rotate."""
+        if self._reconcile():
+            self._async_schedule_rebalance()
+        self._async_rotate()
+
+    def _reconcile(self) -> bool:
+        """Retry or release starts the chargers never reported; True if any changed."""
+        now = time.monotonic()
+        changed = False
+        for entry_id, vehicle in self._vehicles.items():
+            if (
+                not vehicle.commanded
+                or vehicle.confirmed
+                or vehicle.commanded_at is None
+                or now - vehicle.commanded_at < self.start_timeout
+            ):
+                continue
+            changed = True
+            if vehicle.start_attempts < MAX_START_ATTEMPTS:
+                # the next rebalance sends the start again
+                vehicle.commanded = None
+                continue
+            _LOGGER.warning(
+                "Charger %s did not start after %d attempts, giving its slot to the next vehicle",
+                entry_id,
+                vehicle.start_attempts,
+            )
+            self._release(vehicle)
+            vehicle.released = True
+        return changed
+
+    @callback
+    def _async_rotate(self, _now: Any = None) -> None:
+        """Send vehicles that had a full turn to the back while others wait."""
+        now = time.monotonic()
+        waiting = any(
+            self._wants_power(v) and not v.commanded for v in self._vehicles.values()
+        )
+        if not waiting:
+            return
+        rotated = False
+        for vehicle in self._vehicles.values():
+            if (
+                vehicle.commanded
+                and vehicle.active_since is not None
+                and now - vehicle.active_since >= self.rotation_interval
+            ):
+                vehicle.arrival = now
+                rotated = True
+        if rotated:
+            self._async_schedule_rebalance()
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant) -> FleetChargingScheduler:
+    return hass.data.setdefault(DOMAIN, {}).setdefault(
+        DATA_SCHEDULER, FleetChargingScheduler(hass)
+    )
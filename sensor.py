@@ -1,28 +1,239 @@
 """Basic sensors for EVSEMaster integration (minimal)."""
 
 from __future__ import annotations
-from datetime import datetime
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import partial
+from datetime import datetime, timedelta
+from typing import Any
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfPower,UnitOfEnergy,UnitOfTemperature, UnitOfTime
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory, UnitOfElectricCurrent, UnitOfElectricPotential, UnitOfPower,UnitOfEnergy,UnitOfTemperature, UnitOfTime
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN  # noqa: F401
+from .const import DOMAIN
 from .coordinator import EVSEMasterDataUpdateCoordinator,DataSchema
+from .cost import FleetCost
+from .entity import EVSEMasterEntity, always, async_add_reported_entities, charging_status_value, status_reports, status_value
 from .evse_loader import data_types
 
 # Import specific classes from the modules
-EvseStatus = data_types.EvseStatus
-ChargingStatus = data_types.ChargingStatus
 PlugStateEnum = data_types.PlugStateEnum
 
+# seconds between fleet cost writes, however many chargers report energy
+FLEET_WRITE_INTERVAL = 30
+
+
+@dataclass(frozen=True, kw_only=True)
+class EVSEMasterSensorEntityDescription(SensorEntityDescription):
+    """Describes an EVSEMaster sensor."""
+
+    value_fn: Callable[[EVSEMasterDataUpdateCoordinator], Any]
+    exists_fn: Callable[[DataSchema], bool] = always
+    last_reset_fn: Callable[[EVSEMasterDataUpdateCoordinator], datetime | None] | None = None
+    attributes_fn: Callable[[EVSEMasterDataUpdateCoordinator], dict[str, Any]] | None = None
+
+
+def _minutes(seconds: float) -> float:
+    return round(seconds / 60, 1)
+
+
+def _eta(seconds: float) -> datetime:
+    return dt_util.utcnow() + timedelta(seconds=seconds)
+
+
+def _optional(
+    fn: Callable[[EVSEMasterDataUpdateCoordinator], float | None],
+    convert: Callable[[float], Any],
+) -> Callable[[EVSEMasterDataUpdateCoordinator], Any]:
+    def _value(coordinator: EVSEMasterDataUpdateCoordinator) -> Any:
+        value = fn(coordinator)
+        return None if value is None else convert(value)
+
+    return _value
+
+
+SENSORS: tuple[EVSEMasterSensorEntityDescription, ...] = (
+    EVSEMasterSensorEntityDescription(
+        key="current_state",
+        translation_key="current_state",
+        value_fn=status_value("current_state", lambda state: state.name),
+    ),
+    EVSEMasterSensorEntityDescription(
+        key="current_power",
+        translation_key="current_power",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=status_value("current_power"),
+    ),
+    EVSEMasterSensorEntityDescription(
+        key="plug_state",
+        translation_key="plug_state",
+        value_fn=status_value("plug_state", lambda state: PlugStateEnum(state).name),
+    ),
+    EVSEMasterSensorEntityDescription(
+        key="inner_temperature",
+        translation_key="inner_temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        # FIXME: you can change the unit on the EVSE
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        value_fn=status_value("inner_temperature"),
+        exists_fn=status_reports("inner_temperature", absent=-1.0),
+    ),
+    EVSEMasterSensorEntityDescription(
+        key="outer_temperature",
+        translation_key="outer_temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        # FIXME: you can change the unit on the EVSE
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        value_fn=status_value("outer_temperature"),
+        exists_fn=status_reports("outer_temperature", absent=-1.0),
+    ),
+    *(
+        description
+        for phase in (1, 2, 3)
+        for description in (
+            EVSEMasterSensorEntityDescription(
+                key=f"l{phase}_voltage",
+                translation_key=f"l{phase}_voltage",
+                native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+                device_class=SensorDeviceClass.VOLTAGE,
+                state_class=SensorStateClass.MEASUREMENT,
+                value_fn=status_value(f"l{phase}_voltage"),
+                # single-phase units report 0 V on L2/L3
+                exists_fn=always if phase == 1 else status_reports(f"l{phase}_voltage", absent=0.0),
+            ),
+            EVSEMasterSensorEntityDescription(
+                key=f"l{phase}_amps",
+                translation_key=f"l{phase}_amps",
+                native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
+                device_class=SensorDeviceClass.CURRENT,
+                state_class=SensorStateClass.MEASUREMENT,
+                value_fn=status_value(f"l{phase}_amps"),
+                exists_fn=always if phase == 1 else status_reports(f"l{phase}_voltage", absent=0.0),
+            ),
+        )
+    ),
+    EVSEMasterSensorEntityDescription(
+        key="total_kwh",
+        translation_key="total_kwh",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL,
+        value_fn=status_value("total_kwh"),
+    ),
+    EVSEMasterSensorEntityDescription(
+        key="reservation_datetime",
+        translation_key="reservation_datetime",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=charging_status_value(
+            "reservation_datetime", lambda value: value if isinstance(value, datetime) else None
+        ),
+    ),
+    EVSEMasterSensorEntityDescription(
+        key="reservation_max_duration",
+        translation_key="reservation_max_duration",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        value_fn=charging_status_value("max_duration_minutes"),
+    ),
+    EVSEMasterSensorEntityDescription(
+        key="session_energy",
+        translation_key="session_energy",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.session.energy_kwh,
+    ),
+    EVSEMasterSensorEntityDescription(
+        key="time_to_target",
+        translation_key="time_to_target",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        value_fn=_optional(EVSEMasterDataUpdateCoordinator.seconds_to_target, _minutes),
+    ),
+    EVSEMasterSensorEntityDescription(
+        key="target_eta",
+        translation_key="target_eta",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=_optional(EVSEMasterDataUpdateCoordinator.seconds_to_target, _eta),
+    ),
+    EVSEMasterSensorEntityDescription(
+        key="energy_at_departure",
+        translation_key="energy_at_departure",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        value_fn=_optional(EVSEMasterDataUpdateCoordinator.energy_at_departure, lambda kwh: round(kwh, 3)),
+    ),
+    EVSEMasterSensorEntityDescription(
+        key="command_queue_depth",
+        translation_key="command_queue_depth",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.MEASUREMENT,
+        icon="mdi:tray-full",
+        value_fn=lambda coordinator: len(coordinator.command_queue),
+    ),
+    EVSEMasterSensorEntityDescription(
+        key="command_replay_latency",
+        translation_key="command_replay_latency",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        value_fn=lambda coordinator: coordinator.command_queue.last_replay_latency,
+    ),
+)
+
+
+# only created when a price entity or tariff table is configured
+COST_SENSORS: tuple[EVSEMasterSensorEntityDescription, ...] = (
+    EVSEMasterSensorEntityDescription(
+        key="session_cost",
+        translation_key="session_cost",
+        device_class=SensorDeviceClass.MONETARY,
+        state_class=SensorStateClass.TOTAL,
+        suggested_display_precision=2,
+        value_fn=lambda coordinator: coordinator.cost.session_cost,
+        last_reset_fn=lambda coordinator: coordinator.session.started,
+        attributes_fn=lambda coordinator: {
+            "energy_kwh": round(coordinator.session.energy_kwh or 0.0, 3),
+            "user": coordinator.session.user,
+        },
+    ),
+    EVSEMasterSensorEntityDescription(
+        key="daily_cost",
+        translation_key="daily_cost",
+        device_class=SensorDeviceClass.MONETARY,
+        state_class=SensorStateClass.TOTAL,
+        suggested_display_precision=2,
+        value_fn=lambda coordinator: coordinator.cost.day_cost,
+        last_reset_fn=lambda coordinator: coordinator.cost.day_start,
+    ),
+    EVSEMasterSensorEntityDescription(
+        key="total_cost",
+        translation_key="total_cost",
+        device_class=SensorDeviceClass.MONETARY,
+        state_class=SensorStateClass.TOTAL,
+        suggested_display_precision=2,
+        value_fn=lambda coordinator: coordinator.cost.total_cost,
+        attributes_fn=lambda coordinator: {
+            "price": coordinator.cost.last_price,
+            "users": {user: round(cost, 4) for user, cost in coordinator.cost.users.items()},
+        },
+    ),
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -31,153 +242,89 @@ async def async_setup_entry(
 ) -> None:
     coordinator: EVSEMasterDataUpdateCoordinator = entry.runtime_data
 
-    entities: list[SensorEntity] = []
-    entities.append(EVSEStateSensor(coordinator))
-    entities.append(EVSECurrentPowerSensor(coordinator))
-    entities.append(EVSEPlugStateSensor(coordinator))
-    entities.append(EVSEInnerTemperatureSensor(coordinator))
-    entities.append(EVSEOuterTemperatureSensor(coordinator))
-    entities.append(EVSETotalKwhSensor(coordinator))
-    entities.append(EVSEReservationDatetimeSensor(coordinator))
-    entities.append(EVSEReservationDurationSensor(coordinator))
+    async_add_reported_entities(
+        coordinator, SENSORS, partial(EVSEMasterSensor, coordinator), async_add_entities
+    )
 
-    async_add_entities(entities)
+    if coordinator.cost.enabled:
+        async_add_entities(EVSEMasterCostSensor(coordinator, d) for d in COST_SENSORS)
+        fleet = coordinator.cost.fleet
+        # one charger with cost accounting hosts the fleet-wide sensor at a time
+        entry.async_on_unload(
+            fleet.async_add_host(
+                entry.entry_id, lambda: async_add_entities([EVSEFleetCostSensor(fleet)])
+            )
+        )
 
 
-class _Base(CoordinatorEntity[EVSEMasterDataUpdateCoordinator]):
-    _attr_has_entity_name = True
-
-    def __init__(self, coordinator: EVSEMasterDataUpdateCoordinator) -> None:
-        super().__init__(coordinator)
-        self._attr_device_info = coordinator.data.device.get_attr_device_info()
+class EVSEMasterSensor(EVSEMasterEntity, SensorEntity):
+    """Sensor backed by a value accessor from its description."""
 
-    @property
-    def entry(self) -> DataSchema:
-        return self.coordinator.data
-    
+    entity_description: EVSEMasterSensorEntityDescription
 
+    @callback
+    def _async_update_attrs(self) -> None:
+        description = self.entity_description
+        self._attr_native_value = description.value_fn(self.coordinator)
+        if description.last_reset_fn is not None:
+            self._attr_last_reset = description.last_reset_fn(self.coordinator)
+        if description.attributes_fn is not None:
+            self._attr_extra_state_attributes = description.attributes_fn(self.coordinator)
 
-class EVSEStateSensor(_Base, SensorEntity):
-    _attr_translation_key = "current_state"
 
-    def __init__(self, coordinator: EVSEMasterDataUpdateCoordinator) -> None:
-        super().__init__(coordinator)
-        self._attr_unique_id = f"{self.entry.device.serial_number}_current_state"
+class EVSEMasterCostSensor(EVSEMasterSensor):
+    """Cost sensor in the currency configured in Home Assistant."""
 
     @property
-    def native_value(self) -> str | None:
-        status: EvseStatus = self.entry.status
-        if status:
-            return status.current_state.name
-
+    def native_unit_of_measurement(self) -> str:
+        return self.hass.config.currency
 
-class EVSECurrentPowerSensor(_Base, SensorEntity):
-    _attr_translation_key = "current_power"
-    _attr_native_unit_of_measurement = UnitOfPower.WATT
-    _attr_device_class = SensorDeviceClass.POWER
-    _attr_state_class = SensorStateClass.MEASUREMENT
 
-    def __init__(self, coordinator: EVSEMasterDataUpdateCoordinator) -> None:
-        super().__init__(coordinator)
-        self._attr_unique_id = f"{self.entry.device.serial_number}_current_power"
+class EVSEFleetCostSensor(SensorEntity):
+    """Charging cost summed over every charger."""
 
-    @property
-    def native_value(self) -> float | None:
-        status: EvseStatus = self.entry.status
-        if status:
-            return status.current_power
-
-class EVSEPlugStateSensor(_Base, SensorEntity):
-    _attr_translation_key = "plug_state"
+    _attr_has_entity_name = True
+    _attr_translation_key = "fleet_total_cost"
+    _attr_unique_id = f"{DOMAIN}_fleet_total_cost"
+    _attr_device_class = SensorDeviceClass.MONETARY
+    _attr_state_class = SensorStateClass.TOTAL
+    _attr_suggested_display_precision = 2
+    _attr_should_poll = False
 
-    def __init__(self, coordinator: EVSEMasterDataUpdateCoordinator) -> None:
-        super().__init__(coordinator)
-        self._attr_unique_id = f"{self.entry.device.serial_number}_plug_state"
+    def __init__(self, fleet: FleetCost) -> None:
+        self.fleet = fleet
+        self._unsub_write: CALLBACK_TYPE | None = None
 
-    @property
-    def native_value(self) -> str | None:
-        status: EvseStatus = self.entry.status
-        if status and status.plug_state is not None:
-            return PlugStateEnum(status.plug_state).name
-        return None
-    
-class EVSEInnerTemperatureSensor(_Base, SensorEntity):
-    _attr_translation_key = "inner_temperature"
-    _attr_device_class = SensorDeviceClass.TEMPERATURE
-    # FIXME: you can change the unit on the EVSE
-    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
-
-    def __init__(self, coordinator: EVSEMasterDataUpdateCoordinator) -> None:
-        super().__init__(coordinator)
-        self._attr_unique_id = f"{self.entry.device.serial_number}_inner_temperature"
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(self.fleet.async_add_listener(self._async_fleet_changed))
 
-    @property
-    def native_value(self) -> float | None:
-        status: EvseStatus = self.entry.status
-        if status:
-            return status.inner_temperature
-        
-class EVSEOuterTemperatureSensor(_Base, SensorEntity):
-    _attr_translation_key = "outer_temperature"
-    _attr_device_class = SensorDeviceClass.TEMPERATURE
-    # FIXME: you can change the unit on the EVSE
-    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
-
-
-    def __init__(self, coordinator: EVSEMasterDataUpdateCoordinator) -> None:
-        super().__init__(coordinator)
-        self._attr_unique_id = f"{self.entry.device.serial_number}_outer_temperature"
+    async def async_will_remove_from_hass(self) -> None:
+        if self._unsub_write is not None:
+            self._unsub_write()
+            self._unsub_write = None
 
-    @property
-    def native_value(self) -> float | None:
-        status: EvseStatus = self.entry.status
-        if status:
-            return status.outer_temperature
-        
-
-class EVSETotalKwhSensor(_Base, SensorEntity):
-    _attr_translation_key = "total_kwh"
-    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
-    _attr_device_class = SensorDeviceClass.ENERGY
-    _attr_state_class = SensorStateClass.TOTAL
+    @callback
+    def _async_fleet_changed(self) -> None:
+        # coalesce the kWh deltas of every charger into one state write per interval
+        if self._unsub_write is None:
+            self._unsub_write = async_call_later(self.hass, FLEET_WRITE_INTERVAL, self._async_write)
 
-    def __init__(self, coordinator: EVSEMasterDataUpdateCoordinator) -> None:
-        super().__init__(coordinator)
-        self._attr_unique_id = f"{self.entry.device.serial_number}_total_kwh"
+    @callback
+    def _async_write(self, _now: datetime) -> None:
+        self._unsub_write = None
+        self.async_write_ha_state()
 
     @property
-    def native_value(self) -> float | None:
-        status: EvseStatus = self.entry.status
-        if status:
-            return status.total_kwh
-        
-class EVSEReservationDatetimeSensor(_Base, SensorEntity):
-    _attr_translation_key = "reservation_datetime"
-    _attr_device_class = SensorDeviceClass.TIMESTAMP
-
-    def __init__(self, coordinator: EVSEMasterDataUpdateCoordinator) -> None:
-        super().__init__(coordinator)
-        self._attr_unique_id = f"{self.entry.device.serial_number}_reservation_datetime"
+    def native_unit_of_measurement(self) -> str:
+        return self.hass.config.currency
 
     @property
-    def native_value(self) -> float | None:
-        cstatus = self.entry.charging_status
-        if cstatus and isinstance(cstatus.reservation_datetime, datetime):
-            return cstatus.reservation_datetime
-        return None
-    
-class EVSEReservationDurationSensor(_Base, SensorEntity):
-    _attr_translation_key = "reservation_max_duration"
-    _attr_device_class = SensorDeviceClass.DURATION
-    _attr_native_unit_of_measurement = UnitOfTime.MINUTES
-
-    def __init__(self, coordinator: EVSEMasterDataUpdateCoordinator) -> None:
-        super().__init__(coordinator)
-        self._attr_unique_id = f"{self.entry.device.serial_number}_reservation_max_duration"
+    def native_value(self) -> float:
+        return self.fleet.total
 
     @property
-    def native_value(self) -> float | None:
-        cstatus = self.entry.charging_status
-        if cstatus and cstatus.max_duration_minutes is not None:          
-            return cstatus.max_duration_minutes
-        return None
\ No newline at end of file
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return {
+            "today": round(self.fleet.today, 4),
+            "users": {user: round(cost, 4) for user, cost in self.fleet.users.items()},
+        }
@@ -0,0 +1,114 @@
+"""Charging session tracking for EVSEMaster chargers."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .evse_loader import data_types
+
+# Import specific classes from the modules
+ChargingStatus = data_types.ChargingStatus
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+UNKNOWN_USER = "unknown"
+
+
+class ChargingSession:
+    """One plug-in to unplug session of a charger, persisted across restarts.
+
+    Cost accounting and prediction both follow this session (keyed by `started`),
+    so a restart or entry reload with the car still plugged in carries on with
+    the same session instead of starting a new one at the first push.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.session"
+        )
+        self.last_kwh: float | None = None
+        self.plugged_in = False
+        self.started: datetime | None = None
+        self.energy_kwh: float | None = None
+        self.user = UNKNOWN_USER
+        self.stale_charge_id: str | None = None
+        self._save_pending = False
+
+    async def async_load(self) -> None:
+        data = await self._store.async_load()
+        if not data:
+            return
+        self.last_kwh = data.get("last_kwh")
+        self.plugged_in = data.get("plugged_in", False)
+        if started := data.get("started"):
+            self.started = dt_util.parse_datetime(started)
+        self.energy_kwh = data.get("energy_kwh")
+        self.user = data.get("user", UNKNOWN_USER)
+        self.stale_charge_id = data.get("stale_charge_id")
+
+    async def async_unload(self) -> None:
+        """Write pending changes now so a reload reads them back."""
+        await self._store.async_save(self._data_to_save())
+
+    def _data_to_save(self) -> dict[str, Any]:
+        self._save_pending = False
+        return {
+            "last_kwh": self.last_kwh,
+            "plugged_in": self.plugged_in,
+            "started": self.started.isoformat() if self.started else None,
+            "energy_kwh": self.energy_kwh,
+            "user": self.user,
+            "stale_charge_id": self.stale_charge_id,
+        }
+
+    @callback
+    def async_update(
+        self,
+        total_kwh: float | None,
+        plugged_in: bool,
+        charging_status: ChargingStatus | None,
+    ) -> float:
+        """Follow one pushed status sample; return the kWh delivered since the last one."""
+        changed = False
+        charge_id = charging_status.charge_id if charging_status else None
+        if plugged_in and not self.plugged_in:
+            self.started = dt_util.utcnow()
+            self.energy_kwh = 0.0
+            self.user = UNKNOWN_USER
+            # until the EVSE pushes a new one, the charging status is the last session's
+            self.stale_charge_id = charge_id
+            changed = True
+        if plugged_in != self.plugged_in:
+            self.plugged_in = plugged_in
+            changed = True
+        if (
+            charging_status is not None
+            and charging_status.user_id
+            and charge_id != self.stale_charge_id
+            and charging_status.user_id != self.user
+        ):
+            self.user = charging_status.user_id
+            changed = True
+
+        delta = 0.0
+        if total_kwh is not None:
+            previous, self.last_kwh = self.last_kwh, total_kwh
+            if previous is None:
+                changed = True
+            elif total_kwh != previous:
+                # a counter that went down restarted from zero
+                delta = total_kwh - previous if total_kwh > previous else total_kwh
+                if self.energy_kwh is not None:
+                    self.energy_kwh += delta
+                changed = True
+        if changed and not self._save_pending:
+            # the store reads the data when it writes; rescheduling per push only costs timers
+            self._save_pending = True
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        return delta
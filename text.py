@@ -2,23 +2,42 @@
 
 from __future__ import annotations
 
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
 import logging
+from typing import Any
 
-from homeassistant.components.text import TextEntity
+from homeassistant.components.text import TextEntity, TextEntityDescription, TextMode
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .coordinator import EVSEMasterDataUpdateCoordinator, DataSchema
-from .evse_loader import data_types
-
-# Import specific classes from the modules
-EvseStatus = data_types.EvseStatus
+from .coordinator import EVSEMasterDataUpdateCoordinator
+from .entity import EVSEMasterEntity
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True, kw_only=True)
+class EVSEMasterTextEntityDescription(TextEntityDescription):
+    """Describes an EVSEMaster text input."""
+
+    value_fn: Callable[[EVSEMasterDataUpdateCoordinator], str | None]
+    set_value_fn: Callable[[EVSEMasterDataUpdateCoordinator, str], Awaitable[Any]]
+
+
+TEXTS: tuple[EVSEMasterTextEntityDescription, ...] = (
+    EVSEMasterTextEntityDescription(
+        key="nickname",
+        translation_key="nickname",
+        icon="mdi:tag-text",
+        mode=TextMode.TEXT,
+        value_fn=lambda coordinator: coordinator.data.device.nickname,
+        set_value_fn=lambda coordinator, value: coordinator.async_set_nickname(value),
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -27,39 +46,20 @@ async def async_setup_entry(
     """Set up text input entities."""
     coordinator: EVSEMasterDataUpdateCoordinator = entry.runtime_data
 
-    entities: list[TextEntity] = []
-    entities.append(EVSENicknameText(coordinator))
-
-    async_add_entities(entities)
-
-
-class _BaseText(CoordinatorEntity[EVSEMasterDataUpdateCoordinator]):
-    _attr_has_entity_name = True
-
-    def __init__(self, coordinator: EVSEMasterDataUpdateCoordinator) -> None:
-        super().__init__(coordinator)
-        self._attr_device_info = coordinator.data.device.get_attr_device_info()
-
-    @property
-    def entry(self) -> DataSchema:
-        return self.coordinator.data
+    async_add_entities(
+        EVSEMasterText(coordinator, description) for description in TEXTS
+    )
 
 
-class EVSENicknameText(_BaseText, TextEntity):
-    _attr_translation_key = "nickname"
-    _attr_icon = "mdi:tag-text"
-    _attr_mode = "text"
+class EVSEMasterText(EVSEMasterEntity, TextEntity):
+    """Text input backed by accessors from its description."""
 
-    def __init__(self, coordinator: EVSEMasterDataUpdateCoordinator) -> None:
-        super().__init__(coordinator)
-        serial = self.entry.device.serial_number
-        self._attr_unique_id = f"{serial}_nickname"
+    entity_description: EVSEMasterTextEntityDescription
 
-    @property
-    def native_value(self) -> str | None:
-        """Get current nickname from device info."""
-        return self.entry.device.nickname
+    @callback
+    def _async_update_attrs(self) -> None:
+        self._attr_native_value = self.entity_description.value_fn(self.coordinator)
 
     async def async_set_value(self, value: str) -> None:
         """Set the nickname."""
-        await self.coordinator.async_set_nickname(value)
+        await self.entity_description.set_value_fn(self.coordinator, value)
@@ -0,0 +1,161 @@
+"""Websocket API for live EVSEMaster power streams."""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .coordinator import async_get_coordinator_for_device
+from .evse_loader import data_types
+
+# Import specific classes from the modules
+EvseStatus = data_types.EvseStatus
+
+WS_TYPE_SUBSCRIBE_POWER = f"{DOMAIN}/subscribe_power"
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register the websocket commands of the integration."""
+    websocket_api.async_register_command(hass, ws_subscribe_power)
+
+
+class _PowerSubscriber:
+    """Downsample the status stream for one websocket subscription.
+
+    Samples arriving faster than min_interval are folded into a single pending
+    aggregate, so the stream sends at most one message per min_interval however
+    fast the charger pushes. This only rate-limits: each flush still goes into
+    the connection's send queue.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        connection: websocket_api.ActiveConnection,
+        msg_id: int,
+        min_interval: float,
+    ) -> None:
+        self.hass = hass
+        self.connection = connection
+        self.msg_id = msg_id
+        self.min_interval = min_interval
+        self._last_sent = 0.0
+        self._flush_handle: CALLBACK_TYPE | None = None
+        self._status: EvseStatus | None = None
+        self._count = 0
+        self._sum = 0.0
+        self._min = 0.0
+        self._max = 0.0
+
+    @callback
+    def async_add_sample(self, status: EvseStatus) -> None:
+        """Fold a pushed status into the pending aggregate."""
+        power = status.current_power or 0.0
+        if self._count == 0:
+            self._min = self._max = power
+        else:
+            self._min = min(self._min, power)
+            self._max = max(self._max, power)
+        self._count += 1
+        self._sum += power
+        self._status = status
+
+        if self._flush_handle is not None:
+            return
+        wait = self._last_sent + self.min_interval - time.monotonic()
+        if wait <= 0:
+            self._async_flush()
+        else:
+            self._flush_handle = async_call_later(self.hass, wait, self._async_flush)
+
+    @callback
+    def _async_flush(self, _now: Any = None) -> None:
+        self._flush_handle = None
+        status = self._status
+        if status is None or self._count == 0:
+            return
+        self.connection.send_message(
+            websocket_api.event_message(
+                self.msg_id,
+                {
+                    "timestamp": dt_util.utcnow().isoformat(),
+                    "power": status.current_power,
+                    "power_mean": round(self._sum / self._count, 1),
+                    "power_min": self._min,
+                    "power_max": self._max,
+                    "samples": self._count,
+                    "current_state": status.current_state.name if status.current_state is not None else None,
+                    "total_kwh": status.total_kwh,
+                },
+            )
+        )
+        self._last_sent = time.monotonic()
+        self._count = 0
+        self._sum = 0.0
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop any pending flush."""
+        if self._flush_handle is not None:
+            self._flush_handle()
+            self._flush_handle = None
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_SUBSCRIBE_POWER,
+        vol.Required("device_id"): str,
+        vol.Optional("min_interval", default=0.5): vol.All(
+            vol.Coerce(float), vol.Range(min=0.05, max=60)
+        ),
+    }
+)
+@callback
+def ws_subscribe_power(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Stream live power samples of one charger to the frontend."""
+    coordinator = async_get_coordinator_for_device(hass, msg["device_id"])
+    if coordinator is None:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "EVSEMaster device not found"
+        )
+        return
+
+    subscriber = _PowerSubscriber(hass, connection, msg["id"], msg["min_interval"])
+
+    @callback
+    def _coordinator_closed() -> None:
+        # the entry unloaded or reloaded; the card has to subscribe again
+        subscriber.async_cancel()
+        connection.subscriptions.pop(msg["id"], None)
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "EVSEMaster charger was unloaded"
+        )
+
+    unsubscribe_status = coordinator.async_subscribe_status(
+        subscriber.async_add_sample, _coordinator_closed
+    )
+
+    @callback
+    def _unsubscribe() -> None:
+        unsubscribe_status()
+        subscriber.async_cancel()
+
+    connection.subscriptions[msg["id"]] = _unsubscribe
+    connection.send_result(msg["id"])
+
+    # start the graph with the last known sample
+    if coordinator.data.status is not None:
+        subscriber.async_add_sample(coordinator.data.status)